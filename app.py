@@ -1,145 +1,219 @@
 import streamlit as st
 import pandas as pd
-from load_ipeds import connect_db
-import plotly.express as px
+import numpy as np
+from queries import (query_data, query_data_many, query1,
+                     query_tuition_summary1, query_tuition_summary2,
+                     query_repayment, query_aggregate_trends,
+                     query_correlation, query_grad_debt,
+                     query_top_salaries_enhanced)
+
+try:
+    # Optional: compiles the correlation kernel below
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Changed page settings so that tables fit; no need to scroll left/right
 st.set_page_config(layout="wide", page_icon='🎓')
 
+# Years offered by every year selector; ints so they bind as integers
+YEARS = [2019, 2020, 2021, 2022]
+
+# Analysis 5 numeric columns and their display labels
+CORRELATION_COLUMNS = ["in_state_tuition", "out_state_tuition",
+                       "loan_repayment_rate", "avg_faculty_salary"]
+PRETTY = {c: c.replace("_", " ").title() for c in CORRELATION_COLUMNS}
+
+# Analysis 4 metrics: (column in query_aggregate_trends, title, y label)
+METRIC_SPEC = {
+    'In-state Tuition': ("avg_in_state_tuition",
+                         "In-state Tuition Rates Over Time (Aggregate)",
+                         "Rate (USD)"),
+    'Out-of-state Tuition': ("avg_out_state_tuition",
+                             "Out-of-state Tuition Rates Over Time "
+                             "(Aggregate)",
+                             "Rate (USD)"),
+    'Loan Repayment Rate': ("avg_loan_repayment_rate",
+                            "Loan Repayment Rates Over Time (Aggregate)",
+                            "Rate"),
+}
+
+
+def plotly_express():
+    """
+    Imports plotly.express on first use so the import is only paid when a
+    section that draws charts is rendered.
+
+    Returns:
+    module: The plotly.express module.
+    """
+    import plotly.express as px
+    import plotly.io as pio
+
+    try:
+        # Optional: C-backed JSON encoder for every st.plotly_chart figure
+        import orjson  # noqa: F401
+        pio.json.config.default_engine = "orjson"
+    except ImportError:
+        pass
+    return px
 
-def query_data(query, parameters=None):
+
+def _fused_corr(x):
     """
-    Executes an SQL query and returns the result as a pandas DataFrame.
+    Pearson correlation over the rows of x with no NaN, in a single pass.
+
+    Accumulates per-column sums and the upper triangle of cross-products
+    together instead of making a separate pass per statistic.
 
     Parameters:
-    query (str): The SQL query to execute.
+    x (np.ndarray): 2-D float64 array, one column per variable.
 
     Returns:
-    pd.DataFrame: ...
+    np.ndarray: The (columns x columns) correlation matrix.
     """
-    try:
-        connection = connect_db()
-        df = pd.read_sql_query(query, connection, params=parameters)
-        return df
-    except Exception as e:
-        st.error(f"Invalid query: {e}")
-        return None
-    finally:
-        connection.close()
-
-
-# Set up queries
-query1 = """
-    SELECT loc.stabbr AS state, inst.control AS type, COUNT(*) AS
-    num_institutions
-    FROM institutions AS inst
-    JOIN location AS loc ON inst.unitid = loc.unitid
-    JOIN ipeds_directory AS ipeds ON loc.unitid = ipeds.unitid
-    WHERE ipeds.year = %s
-    GROUP BY loc.stabbr, inst.control
-    ORDER BY loc.stabbr;
-"""
-
-query2 = """
-    SELECT loc.stabbr AS state, COUNT(*) AS num_institutions
-    FROM institutions AS inst
-    JOIN location AS loc ON inst.unitid = loc.unitid
-    JOIN ipeds_directory AS ipeds ON loc.unitid = ipeds.unitid
-    WHERE ipeds.year = %s
-    GROUP BY loc.stabbr
-    ORDER BY loc.stabbr;
-"""
-
-query3 = """
-    SELECT inst.control AS type, COUNT(*) AS num_institutions
-    FROM institutions AS inst
-    JOIN ipeds_directory AS ipeds ON inst.unitid = ipeds.unitid
-    WHERE ipeds.year = %s
-    GROUP BY inst.control;
-"""
-
-# Streamlit Dashboard Code
-st.title("Team Olympia Dashboard")
-st.write("Explore data about institutions across the United States.")
-
-
-# Analysis 1: Number of Institutions by State and Type
-st.header("Number of Institutions by State and Type")
-s1 = "Select Year for Institution Analysis"
-selected_year_institutions = st.selectbox(s1,
-                                          ['2019', '2020', '2021', '2022'],
-                                          key="institutions_year",
-                                          index=2)
-data1 = query_data(query1, parameters=(selected_year_institutions,))
-data2 = query_data(query2, parameters=(selected_year_institutions,))
-data3 = query_data(query3, parameters=(selected_year_institutions,))
-
-# Map institution types
-mapping = {
-    '1': 'Public',
-    '2': 'Private non-profit',
-    '3': 'Private for-profit',
-    '4': 'Foreign'
-}
-if data1 is not None:
-    data1['type'] = data1['type'].replace(mapping)
-if data3 is not None:
-    data3['type'] = data3['type'].replace(mapping)
+    n, c = x.shape
+    sums = np.zeros(c)
+    products = np.zeros((c, c))
+    count = 0
+    for k in range(n):
+        complete = True
+        for i in range(c):
+            if np.isnan(x[k, i]):
+                complete = False
+                break
+        if not complete:
+            continue
+        count += 1
+        for i in range(c):
+            sums[i] += x[k, i]
+            for j in range(i, c):
+                products[i, j] += x[k, i] * x[k, j]
+    out = np.empty((c, c))
+    for i in range(c):
+        for j in range(i, c):
+            cov = products[i, j] - sums[i] * sums[j] / count
+            var_i = products[i, i] - sums[i] * sums[i] / count
+            var_j = products[j, j] - sums[j] * sums[j] / count
+            out[i, j] = out[j, i] = cov / np.sqrt(var_i * var_j)
+    return out
+
+
+# fastmath is left off: it would let the compiler assume there are no NaNs
+_fused_corr_jit = (njit(cache=True, error_model="numpy")(_fused_corr)
+                   if njit else None)
+
+
+def complete_case_corr(values):
+    """
+    Correlation matrix over the rows with every value present.
 
+    Uses the Numba-compiled single-pass kernel when Numba is installed,
+    otherwise one np.corrcoef over the NaN-free rows.
 
-# Row 1: Tables and Pie Chart
-row1_col1, row1_col2, row1_col3, row1_col4 = st.columns([2.7, 2, 2.3, 3])
+    Parameters:
+    values (np.ndarray): 2-D float64 array, one column per variable.
 
+    Returns:
+    np.ndarray: The (columns x columns) correlation matrix.
+    """
+    if _fused_corr_jit is not None:
+        return _fused_corr_jit(values)
+    values = values[~np.isnan(values).any(axis=1)]
+    return np.corrcoef(values, rowvar=False)
 
-with row1_col1:
-    st.subheader("State & Type")
-    if data1 is not None and not data1.empty:
-        st.dataframe(data1)
-    else:
-        st.warning("No data available for this year.")
 
-with row1_col2:
-    st.subheader("State Summary")
-    if data2 is not None and not data2.empty:
-        st.dataframe(data2)
-    else:
-        st.warning("No data available for this year.")
+def downcast(df):
+    """
+    Narrows 64-bit numeric columns before a frame is handed to Plotly.
 
-with row1_col3:
-    st.subheader("Institution Types")
-    if data3 is not None and not data3.empty:
-        st.dataframe(data3)
-    else:
-        st.warning("No data available for this year.")
-
-with row1_col4:
-    st.subheader("Institution Type Distribution")
-    if data3 is not None and not data3.empty:
-        plot_title1 = "Institution Type Distribution for " + \
-                   f"{selected_year_institutions}"
-        pie_chart = px.pie(
-            data3,
-            values="num_institutions",
-            names="type",
-            title=plot_title1,
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        st.plotly_chart(pie_chart, use_container_width=True)
-    else:
-        st.warning("No data available to generate pie chart.")
+    Plotly ships every value to the browser as JSON, so float32/int32
+    columns roughly halve the payload. The caller's frame is not modified.
+
+    Parameters:
+    df (pd.DataFrame): The frame to plot.
+
+    Returns:
+    pd.DataFrame: A shallow copy with float64 -> float32 and int64
+    narrowed to the smallest integer type that holds the values.
+    """
+    df = df.copy(deep=False)
+    for col in df.select_dtypes("float64"):
+        df[col] = df[col].astype("float32")
+    for col in df.select_dtypes("int64"):
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def correlation_summary(correlation_data):
+    """
+    Selects the Analysis 5 numeric columns and correlates them.
+
+    Cached so the scatter plot's multiselect reruns reuse both results
+    instead of re-slicing the frame and recomputing the matrix.
+
+    Parameters:
+    correlation_data (pd.DataFrame): The query_correlation result.
+
+    Returns:
+    tuple: The numeric columns as a DataFrame and their complete-case
+    correlation matrix.
+    """
+    # Columns already arrive as float64, no to_numeric pass needed
+    numeric_data = correlation_data[CORRELATION_COLUMNS]
+    values = numeric_data.to_numpy(dtype=np.float64, copy=False)
+    correlation_matrix = pd.DataFrame(complete_case_corr(values),
+                                      index=CORRELATION_COLUMNS,
+                                      columns=CORRELATION_COLUMNS)
+    return numeric_data, correlation_matrix
+
+
+@st.cache_data(show_spinner=False)
+def build_type_pie(data3, year):
+    """
+    Builds the institution type pie chart for Analysis 1.
+
+    Cached on the frame and year, so reruns with unchanged data reuse the
+    figure instead of running Plotly's layout code again.
+
+    Parameters:
+    data3 (pd.DataFrame): Institution counts by type.
+    year (int): The selected year, used in the title.
+
+    Returns:
+    plotly.graph_objects.Figure: The pie chart.
+    """
+    px = plotly_express()
+    return px.pie(
+        downcast(data3),
+        values="num_institutions",
+        names="type",
+        title=f"Institution Type Distribution for {year}",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
 
 
-# Row 2: US Map by Institutions
-if data2 is not None and not data2.empty:
-    plot_title2 = "Map of Number of Institutions by State " + \
-        f"for {selected_year_institutions}"
+@st.cache_data(show_spinner=False)
+def build_state_map(data2, year):
+    """
+    Builds the US choropleth of institution counts for Analysis 1.
+
+    Parameters:
+    data2 (pd.DataFrame): Institution counts by state.
+    year (int): The selected year, used in the title.
+
+    Returns:
+    plotly.graph_objects.Figure: The choropleth map.
+    """
+    px = plotly_express()
     map_chart = px.choropleth(
-        data2,
+        downcast(data2),
         locations="state",  # State abbreviation
         locationmode="USA-states",  # Match state abbreviations
         color="num_institutions",  # Number of institutions
         hover_name="state",  # State name on hover
-        title=plot_title2,
+        title=f"Map of Number of Institutions by State for {year}",
         labels={"num_institutions": "Number of Institutions"},
         color_continuous_scale="Viridis",
         scope="usa"  # Focus on US map
@@ -152,84 +226,23 @@ if data2 is not None and not data2.empty:
         # Adjust margins for better use of space
         margin={"r": 0, "t": 50, "l": 0, "b": 0}
     )
+    return map_chart
 
-    # Render the map
-    # Disable container width to use custom size
-    st.plotly_chart(map_chart, use_container_width=False)
-else:
-    st.warning("No data available to generate the US map.")
-
-
-# SQL query for tuition rates summary
-query_tuition_summary1 = """
-    SELECT
-        loc.STABBR AS state,
-        ipeds.CCBASIC AS carnegie_classification,
-        AVG(fin.TUITIONFEE_IN) AS avg_in_state_tuition,
-        AVG(fin.TUITIONFEE_OUT) AS avg_out_state_tuition
-    FROM
-        Financial_Data fin
-    JOIN
-        Institutions inst ON fin.UNITID = inst.UNITID
-    JOIN
-        Location loc ON inst.UNITID = loc.UNITID
-    JOIN
-        IPEDS_Directory ipeds ON
-        fin.UNITID = ipeds.UNITID AND fin.YEAR = ipeds.YEAR
-    WHERE
-        fin.YEAR = %s
-    GROUP BY
-        loc.STABBR,
-        ipeds.CCBASIC
-    ORDER BY
-        loc.STABBR,
-        ipeds.CCBASIC;
-"""
-
-query_tuition_summary2 = """
-    SELECT
-        ipeds.CCBASIC AS carnegie_classification,
-        AVG(fin.TUITIONFEE_IN) AS avg_in_state_tuition,
-        AVG(fin.TUITIONFEE_OUT) AS avg_out_state_tuition
-    FROM
-        Financial_Data fin
-    JOIN
-        Institutions inst ON fin.UNITID = inst.UNITID
-    JOIN
-        Location loc ON inst.UNITID = loc.UNITID
-    JOIN
-        IPEDS_Directory ipeds ON
-        fin.UNITID = ipeds.UNITID AND fin.YEAR = ipeds.YEAR
-    WHERE
-        fin.YEAR = %s
-    GROUP BY
-        ipeds.CCBASIC
-    ORDER BY
-        ipeds.CCBASIC;
-"""
-
-# Analysis 2: Tuition Rates by State and Carnegie Classification
-st.header("Tuition Rates by State and Carnegie Classification")
-selected_year_tuition = st.selectbox("Select Year for Tuition Analysis",
-                                     ['2019', '2020', '2021', '2022'],
-                                     key="tuition_year",
-                                     index=2)
-tuition_data1 = query_data(query_tuition_summary1,
-                           parameters=(selected_year_tuition,))
-
-tuition_data2 = query_data(query_tuition_summary2,
-                           parameters=(selected_year_tuition,))
-# Display results
-if tuition_data1 is not None and not tuition_data1.empty:
-    st.write(f"### Tuition Rate Summary for {selected_year_tuition}")
-    st.dataframe(tuition_data1, use_container_width=True)
-else:
-    w1 = f"No tuition data available for the year {selected_year_tuition}."
-    st.warning(w1)
-
-if tuition_data2 is not None and not tuition_data2.empty:
-    bar_chart = px.bar(
-        tuition_data2,
+
+@st.cache_data(show_spinner=False)
+def build_tuition_bar(tuition_data2):
+    """
+    Builds the tuition by Carnegie classification bar chart for Analysis 2.
+
+    Parameters:
+    tuition_data2 (pd.DataFrame): Average tuition by classification.
+
+    Returns:
+    plotly.graph_objects.Figure: The grouped bar chart.
+    """
+    px = plotly_express()
+    return px.bar(
+        downcast(tuition_data2),
         x="carnegie_classification",
         y=["avg_in_state_tuition", "avg_out_state_tuition"],
         title="Average Tuition Rates by Carnegie Classification",
@@ -241,116 +254,179 @@ if tuition_data2 is not None and not tuition_data2.empty:
         barmode="group",
         height=500,
     )
-    st.plotly_chart(bar_chart, use_container_width=True)
-else:
-    st.warning("No tuition data available to generate the bar chart.")
-
-
-# Best- and worst-performing institutions by loan repayment rates
-query_repayment = """
-(
-    SELECT
-        inst.INSTNM AS institution_name,
-        loc.STABBR AS state,
-        fin.CDR3 AS loan_repayment_rate,
-        'Best' AS category
-    FROM
-        Institutions inst
-    JOIN
-        Location loc ON inst.UNITID = loc.UNITID
-    JOIN
-        Financial_Data fin ON inst.UNITID = fin.UNITID
-    WHERE
-        fin.YEAR = %s
-    ORDER BY
-        fin.CDR3 ASC  -- Lowest default rates (best repayment rates)
-    LIMIT 5
-)
-UNION
-(
-    SELECT
-        inst.INSTNM AS institution_name,
-        loc.STABBR AS state,
-        fin.CDR3 AS loan_repayment_rate,
-        'Worst' AS category
-    FROM
-        Institutions inst
-    JOIN
-        Location loc ON inst.UNITID = loc.UNITID
-    JOIN
-        Financial_Data fin ON inst.UNITID = fin.UNITID
-    WHERE
-        fin.YEAR = %s
-    ORDER BY
-        fin.CDR3 DESC  -- Highest default rates (worst repayment rates)
-    LIMIT 5
-)
-ORDER BY
-    category, loan_repayment_rate;
-"""
-
-# Streamlit Analysis 3: Best and Worst Institutions by Loan Repayment Rates
-st.header("Best- and Worst-Performing Institutions by Loan Repayment Rates")
-s2 = "Select Year for Loan Repayment Analysis"
-selected_year_repayment = st.selectbox(s2,
-                                       ['2019', '2020', '2021', '2022'],
-                                       key="repayment_year",
-                                       index=2)
-
-# Execute the query with the year parameter passed twice
-repayment_data = query_data(query_repayment,
-                            parameters=(selected_year_repayment,
-                                        selected_year_repayment))
-
-if repayment_data is not None and not repayment_data.empty:
-    st.subheader("Loan Repayment Performance")
-    st.dataframe(repayment_data, use_container_width=True)
-else:
-    w2 = f"No repayment data available for the year {selected_year_repayment}."
-    st.warning(w2)
-
-
-# Analysis 4: Tuition Rates and Loan Repayment Trends Over Time ----
-st.header("Trends in Tuition Rates and Loan Repayment Rates Over Time")
-
-# Select metric to plot
-s4 = "Select Aggregate Metric"
-selected_metric = st.selectbox(s4,
-                               ['In-state Tuition',
-                                'Out-of-state Tuition',
-                                'Loan Repayment Rate'],
-                               key="aggregate_metric")
-# Aggregate Trends
-if selected_metric == 'In-state Tuition':
-    query_aggregate_trends = """
-        SELECT
-            fin.YEAR AS year,
-            inst.CONTROL AS type,
-            AVG(fin.TUITIONFEE_IN) AS avg_in_state_tuition
-        FROM
-            Financial_Data fin
-        JOIN
-            Institutions inst ON fin.UNITID = inst.UNITID
-        GROUP BY
-            fin.YEAR, inst.CONTROL
-        ORDER BY
-            fin.YEAR, inst.CONTROL;
-        """
-    aggregate_data = query_data(query_aggregate_trends)
-    if aggregate_data is not None:
-        aggregate_data['type'] = aggregate_data['type'].replace(mapping)
-
-    if aggregate_data is not None and not aggregate_data.empty:
-        # Ensure column names are lowercase for consistency
-        aggregate_data.columns = aggregate_data.columns.str.lower()
+
+
+@st.cache_data(show_spinner=False)
+def build_correlation_heatmap(correlation_matrix):
+    """
+    Builds the correlation heatmap for Analysis 5.
+
+    Parameters:
+    correlation_matrix (pd.DataFrame): A square correlation matrix.
+
+    Returns:
+    plotly.graph_objects.Figure: The heatmap.
+    """
+    px = plotly_express()
+    return px.imshow(
+        correlation_matrix,
+        text_auto=True,
+        color_continuous_scale="RdBu",
+        title="Correlation Heatmap",
+        labels={"color": "Correlation Coefficient"},
+        height=500,
+    )
+
+
+@st.fragment
+def analysis_institution_counts():
+    """
+    Analysis 1: Number of institutions by state and type for one year.
+    """
+    st.header("Number of Institutions by State and Type")
+    s1 = "Select Year for Institution Analysis"
+    selected_year_institutions = st.selectbox(s1,
+                                              YEARS,
+                                              key="institutions_year",
+                                              index=2)
+    data1 = query_data(query1, parameters=(selected_year_institutions,))
+
+    # State and type summaries are rollups of data1; no need to re-query.
+    # NULL states and types keep their own group, as in SQL GROUP BY.
+    data2 = data3 = data1
+    if not data1.empty:
+        data2 = data1.groupby("state", as_index=False, observed=True,
+                              dropna=False)["num_institutions"].sum()
+        data3 = data1.groupby("type", as_index=False, observed=True,
+                              dropna=False)["num_institutions"].sum()
+
+    # Row 1: Tables and Pie Chart
+    row1_col1, row1_col2, row1_col3, row1_col4 = st.columns([2.7, 2, 2.3, 3])
+
+    with row1_col1:
+        st.subheader("State & Type")
+        if not data1.empty:
+            st.dataframe(data1)
+        else:
+            st.warning("No data available for this year.")
+
+    with row1_col2:
+        st.subheader("State Summary")
+        if not data2.empty:
+            st.dataframe(data2)
+        else:
+            st.warning("No data available for this year.")
+
+    with row1_col3:
+        st.subheader("Institution Types")
+        if not data3.empty:
+            st.dataframe(data3)
+        else:
+            st.warning("No data available for this year.")
+
+    with row1_col4:
+        st.subheader("Institution Type Distribution")
+        if not data3.empty:
+            pie_chart = build_type_pie(data3, selected_year_institutions)
+            st.plotly_chart(pie_chart, use_container_width=True)
+        else:
+            st.warning("No data available to generate pie chart.")
+
+    # Row 2: US Map by Institutions
+    if not data2.empty:
+        map_chart = build_state_map(data2, selected_year_institutions)
+
+        # Render the map
+        # Disable container width to use custom size
+        st.plotly_chart(map_chart, use_container_width=False)
+    else:
+        st.warning("No data available to generate the US map.")
+
+
+@st.fragment
+def analysis_tuition():
+    """
+    Analysis 2: Tuition rates by state and Carnegie classification.
+    """
+    st.header("Tuition Rates by State and Carnegie Classification")
+    selected_year_tuition = st.selectbox("Select Year for Tuition Analysis",
+                                         YEARS,
+                                         key="tuition_year",
+                                         index=2)
+    # Both summaries are independent; fetch them at the same time
+    tuition_data1, tuition_data2 = query_data_many(
+        [query_tuition_summary1, query_tuition_summary2],
+        parameters=(selected_year_tuition,))
+
+    # Display results
+    if not tuition_data1.empty:
+        st.write(f"### Tuition Rate Summary for {selected_year_tuition}")
+        st.dataframe(tuition_data1, use_container_width=True)
+    else:
+        w1 = f"No tuition data available for the year {selected_year_tuition}."
+        st.warning(w1)
+
+    if not tuition_data2.empty:
+        bar_chart = build_tuition_bar(tuition_data2)
+        st.plotly_chart(bar_chart, use_container_width=True)
+    else:
+        st.warning("No tuition data available to generate the bar chart.")
+
+
+@st.fragment
+def analysis_repayment():
+    """
+    Analysis 3: Best- and worst-performing institutions by repayment rate.
+    """
+    h2 = "Best- and Worst-Performing Institutions by Loan Repayment Rates"
+    st.header(h2)
+    s2 = "Select Year for Loan Repayment Analysis"
+    selected_year_repayment = st.selectbox(s2,
+                                           YEARS,
+                                           key="repayment_year",
+                                           index=2)
+
+    repayment_data = query_data(query_repayment,
+                                parameters=(selected_year_repayment,))
+
+    if not repayment_data.empty:
+        st.subheader("Loan Repayment Performance")
+        st.dataframe(repayment_data, use_container_width=True)
+    else:
+        w2 = "No repayment data available for the year " + \
+            f"{selected_year_repayment}."
+        st.warning(w2)
+
+
+@st.fragment
+def analysis_trends():
+    """
+    Analysis 4: Tuition and loan repayment trends over time.
+    """
+    px = plotly_express()
+    st.header("Trends in Tuition Rates and Loan Repayment Rates Over Time")
+
+    # Select metric to plot
+    s4 = "Select Aggregate Metric"
+    selected_metric = st.selectbox(s4,
+                                   list(METRIC_SPEC),
+                                   key="aggregate_metric")
+    # Partitioned reads come back unordered; px.line needs year order
+    aggregate_data = query_data(query_aggregate_trends, partition_on="year")
+    if not aggregate_data.empty:
+        aggregate_data = aggregate_data.sort_values(["year", "type"],
+                                                    ignore_index=True)
+    trend_column, trend_title, trend_label = METRIC_SPEC[selected_metric]
+
+    if not aggregate_data.empty:
         fig = px.line(
-            aggregate_data,
-            x="year",  # Ensure lowercase column name
-            y="avg_in_state_tuition",
+            downcast(aggregate_data),
+            x="year",
+            y=trend_column,
             color="type",
-            title="In-state Tuition Rates Over Time (Aggregate)",
+            title=trend_title,
             labels={"year": "Year",
-                    "avg_in_state_tuition": "Rate (USD)",
+                    trend_column: trend_label,
                     "type": "Institution Type"},
             height=500
         )
@@ -358,284 +434,189 @@ if selected_metric == 'In-state Tuition':
     else:
         st.warning("No data available for aggregate trends.")
 
-elif selected_metric == 'Out-of-state Tuition':
-    query_aggregate_trends = """
-        SELECT
-            fin.YEAR AS year,
-            inst.CONTROL AS type,
-            AVG(fin.TUITIONFEE_OUT) AS avg_out_state_tuition
-        FROM
-            Financial_Data fin
-        JOIN
-            Institutions inst ON fin.UNITID = inst.UNITID
-        GROUP BY
-            fin.YEAR, inst.CONTROL
-        ORDER BY
-            fin.YEAR, inst.CONTROL;
-        """
-    aggregate_data = query_data(query_aggregate_trends)
-    if aggregate_data is not None:
-        aggregate_data['type'] = aggregate_data['type'].replace(mapping)
-
-    if aggregate_data is not None and not aggregate_data.empty:
-        # Ensure column names are lowercase for consistency
-        aggregate_data.columns = aggregate_data.columns.str.lower()
-        fig = px.line(
-            aggregate_data,
-            x="year",  # Ensure lowercase column name
-            y="avg_out_state_tuition",
-            color="type",
-            title="Out-of-state Tuition Rates Over Time (Aggregate)",
-            labels={"year": "Year",
-                    "avg_out_state_tuition": "Rate (USD)",
-                    "type": "Institution Type"},
-            height=500
+
+@st.fragment
+def analysis_correlation():
+    """
+    Analysis 5: Correlation between tuition, loan repayment rates and
+    faculty salaries.
+    """
+    px = plotly_express()
+    h1 = "Correlation Analysis: Tuition, Loan Repayment Rates, " + \
+        "and Faculty Salaries"
+    st.header(h1)
+
+    # Year selection
+    s5 = "Select Year for Correlation Analysis"
+    selected_year_correlation = st.selectbox(s5,
+                                             YEARS,
+                                             key="correlation_year",
+                                             index=2)
+
+    # One row per institution; read in chunks to bound peak memory
+    correlation_data = query_data(query_correlation,
+                                  parameters=(selected_year_correlation,),
+                                  chunksize=50_000)
+
+    # Check if data is available
+    if not correlation_data.empty:
+        st.subheader("Data Preview")
+        st.dataframe(correlation_data)
+
+        numeric_data, correlation_matrix = \
+            correlation_summary(correlation_data)
+
+        # Display Correlation Matrix
+        st.subheader("Correlation Matrix")
+        st.write(correlation_matrix)
+
+        # Heatmap for Correlation Matrix
+        st.subheader("Heatmap of Correlations")
+        fig_heatmap = build_correlation_heatmap(correlation_matrix)
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+
+        # Scatter Plots
+        st.subheader("Scatter Plots to Visualize Correlations")
+        scatter_columns = st.multiselect(
+            "Select Columns for Scatter Plot",
+            options=CORRELATION_COLUMNS,
+            default=["in_state_tuition", "loan_repayment_rate"]
         )
-        st.plotly_chart(fig, use_container_width=True)
+        if len(scatter_columns) == 2:
+            plot_title3 = f"Scatter Plot: {scatter_columns[0]} vs " + \
+                f"{scatter_columns[1]}"
+            # One point per institution; the largest chart payload here
+            fig_scatter = px.scatter(
+                downcast(numeric_data[scatter_columns]),
+                x=scatter_columns[0],
+                y=scatter_columns[1],
+                title=plot_title3,
+                labels={scatter_columns[0]: PRETTY[scatter_columns[0]],
+                        scatter_columns[1]: PRETTY[scatter_columns[1]]},
+                height=500
+            )
+            st.plotly_chart(fig_scatter, use_container_width=True)
+
     else:
-        st.warning("No data available for aggregate trends.")
+        w3 = f"No data available for the year {selected_year_correlation}."
+        st.warning(w3)
 
-else:
-    query_aggregate_trends = """
-        SELECT
-            fin.YEAR AS year,
-            inst.CONTROL AS type,
-            AVG(fin.CDR3) AS avg_loan_repayment_rate
-        FROM
-            Financial_Data fin
-        JOIN
-            Institutions inst ON fin.UNITID = inst.UNITID
-        GROUP BY
-            fin.YEAR, inst.CONTROL
-        ORDER BY
-            fin.YEAR, inst.CONTROL;
-        """
-    aggregate_data = query_data(query_aggregate_trends)
-    if aggregate_data is not None:
-        aggregate_data['type'] = aggregate_data['type'].replace(mapping)
-
-    if aggregate_data is not None and not aggregate_data.empty:
-        # Ensure column names are lowercase for consistency
-        aggregate_data.columns = aggregate_data.columns.str.lower()
-        fig = px.line(
-            aggregate_data,
-            x="year",  # Ensure lowercase column name
-            y="avg_loan_repayment_rate",
-            color="type",
-            title="Loan Repayment Rates Over Time (Aggregate)",
+
+@st.fragment
+def analysis_grad_debt():
+    """
+    Analysis 6: Trends in graduate debt over time.
+    """
+    px = plotly_express()
+    st.header("Trends in Graduate Debt Over Time")
+
+    # Fetch data
+    grad_debt_data = query_data(query_grad_debt)
+
+    # Check if data is available
+    if not grad_debt_data.empty:
+        st.subheader("Graduate Debt Trends")
+        st.dataframe(grad_debt_data)
+
+        # Line chart for graduate debt trends
+        fig_grad_debt = px.line(
+            downcast(grad_debt_data),
+            x="year",
+            y="avg_grad_debt",
+            title="Trends in Graduate Debt Over Time",
             labels={"year": "Year",
-                    "avg_loan_repayment_rate": "Rate",
-                    "type": "Institution Type"},
+                    "avg_grad_debt": "Average Graduate Debt (USD)"},
             height=500
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_grad_debt, use_container_width=True)
     else:
-        st.warning("No data available for aggregate trends.")
+        st.warning("No data available for graduate debt trends.")
 
-# Analysis 5: Correlation between Tuition, Loan Repayment Rates,
-# and Faculty Salaries
-h1 = "Correlation Analysis: Tuition, Loan Repayment Rates, " + \
-    "and Faculty Salaries"
-st.header(h1)
-
-# Year selection
-s5 = "Select Year for Correlation Analysis"
-selected_year_correlation = st.selectbox(s4,
-                                         ['2019', '2020', '2021', '2022'],
-                                         key="correlation_year",
-                                         index=2)
 
-# Query data
-query_correlation = """
-    SELECT
-        inst.INSTNM AS institution_name,
-        fin.TUITIONFEE_IN AS in_state_tuition,
-        fin.TUITIONFEE_OUT AS out_state_tuition,
-        fin.CDR3 AS loan_repayment_rate,
-        fin.AVGFACSAL AS avg_faculty_salary
-    FROM
-        Financial_Data fin
-    JOIN
-        Institutions inst ON fin.UNITID = inst.UNITID
-    WHERE
-        fin.YEAR = %s
-    ORDER BY
-        inst.INSTNM;
-"""
-correlation_data = query_data(query_correlation,
-                              parameters=(selected_year_correlation,))
-
-# Check if data is available
-if correlation_data is not None and not correlation_data.empty:
-    st.subheader("Data Preview")
-    st.dataframe(correlation_data)
-
-    # Convert data types to numeric for correlation analysis
-    correlation_data.columns = correlation_data.columns.str.lower()
-    correlation_cols = ["in_state_tuition", "out_state_tuition",
-                        "loan_repayment_rate", "avg_faculty_salary"]
-    numeric_data = correlation_data[correlation_cols].apply(pd.to_numeric,
-                                                            errors="coerce")
-
-    # Display Correlation Matrix
-    st.subheader("Correlation Matrix")
-    correlation_matrix = numeric_data.corr()
-    st.write(correlation_matrix)
-
-    # Heatmap for Correlation Matrix
-    st.subheader("Heatmap of Correlations")
-    fig_heatmap = px.imshow(
-        correlation_matrix,
-        text_auto=True,
-        color_continuous_scale="RdBu",
-        title="Correlation Heatmap",
-        labels={"color": "Correlation Coefficient"},
-        height=500,
-    )
-    st.plotly_chart(fig_heatmap, use_container_width=True)
-
-    # Scatter Plots
-    st.subheader("Scatter Plots to Visualize Correlations")
-    scatter_columns = st.multiselect(
-        "Select Columns for Scatter Plot",
-        options=["in_state_tuition", "out_state_tuition",
-                 "loan_repayment_rate", "avg_faculty_salary"],
-        default=["in_state_tuition", "loan_repayment_rate"]
-    )
-    if len(scatter_columns) == 2:
-        plot_title3 = f"Scatter Plot: {scatter_columns[0]} vs " + \
-            f"{scatter_columns[1]}"
-        fig_scatter = px.scatter(
-            numeric_data,
-            x=scatter_columns[0],
-            y=scatter_columns[1],
-            title=plot_title3,
-            labels={scatter_columns[0]:
-                    scatter_columns[0].replace("_", " ").title(),
-                    scatter_columns[1]:
-                    scatter_columns[1].replace("_", " ").title()},
+@st.fragment
+def analysis_faculty_salaries():
+    """
+    Analysis 7: Top institutions by faculty salaries.
+    """
+    px = plotly_express()
+    st.header("Top Institutions by Faculty Salaries")
+
+    # Fetch enhanced data
+    faculty_salary_data_enhanced = query_data(query_top_salaries_enhanced)
+    if not faculty_salary_data_enhanced.empty:
+        st.subheader("Top Institutions by Faculty Salaries")
+
+        # Display the dataframe
+        st.dataframe(faculty_salary_data_enhanced)
+
+        # Horizontal bar chart grouped by institution type
+        fig_salaries_grouped = px.bar(
+            downcast(faculty_salary_data_enhanced),
+            x="avg_faculty_salary",
+            y="institution_name",
+            color="type",  # Grouped by institution type
+            orientation="h",
+            title="Top Institutions by Faculty Salaries (Grouped by Type)",
+            labels={
+                "avg_faculty_salary": "Average Faculty Salary (USD)",
+                "institution_name": "Institution Name",
+                "type": "Institution Type"
+            },
             height=500
         )
-        st.plotly_chart(fig_scatter, use_container_width=True)
-
-else:
-    st.warning(f"No data available for the year {selected_year_correlation}.")
-
-
-# Analysis 6: Trends in Graduate Debt
-st.header("Trends in Graduate Debt Over Time")
-
-# Query to fetch graduate debt trends
-query_grad_debt = """
-    SELECT
-        YEAR AS year,
-        AVG(GRAD_DEBT_MDN) AS avg_grad_debt
-    FROM
-        Admissions_Data
-    WHERE
-        GRAD_DEBT_MDN IS NOT NULL
-    GROUP BY
-        YEAR
-    ORDER BY
-        YEAR;
-"""
-
-# Fetch data
-grad_debt_data = query_data(query_grad_debt)
-
-# Check if data is available
-if grad_debt_data is not None and not grad_debt_data.empty:
-    st.subheader("Graduate Debt Trends")
-    st.dataframe(grad_debt_data)
-
-    # Line chart for graduate debt trends
-    fig_grad_debt = px.line(
-        grad_debt_data,
-        x="year",
-        y="avg_grad_debt",
-        title="Trends in Graduate Debt Over Time",
-        labels={"year": "Year",
-                "avg_grad_debt": "Average Graduate Debt (USD)"},
-        height=500
-    )
-    st.plotly_chart(fig_grad_debt, use_container_width=True)
-else:
-    st.warning("No data available for graduate debt trends.")
-
-# Analysis 7: Top Institutions by Faculty Salaries
-st.header("Top Institutions by Faculty Salaries")
-
-# SQL query to fetch top institutions
-# Enhanced SQL query to include institution type
-query_top_salaries_enhanced = """
-    SELECT
-        inst.INSTNM AS institution_name,
-        fin.AVGFACSAL AS avg_faculty_salary,
-        fin.TUITIONFEE_IN AS in_state_tuition,
-        fin.TUITIONFEE_OUT AS out_state_tuition,
-        inst.CONTROL AS type
-    FROM
-        Financial_Data fin
-    JOIN
-        Institutions inst ON fin.UNITID = inst.UNITID
-    WHERE
-        fin.AVGFACSAL IS NOT NULL
-    ORDER BY
-        fin.AVGFACSAL DESC
-    LIMIT 10;
-"""
-
-
-# Fetch enhanced data
-faculty_salary_data_enhanced = query_data(query_top_salaries_enhanced)
-if faculty_salary_data_enhanced is not None:
-    faculty_salary_data_enhanced['type'] = \
-        faculty_salary_data_enhanced['type'].replace(mapping)
-if (faculty_salary_data_enhanced is not None and
-        not faculty_salary_data_enhanced.empty):
-    st.subheader("Top Institutions by Faculty Salaries")
-
-    # Display the dataframe
-    st.dataframe(faculty_salary_data_enhanced)
-
-    # Horizontal bar chart grouped by institution type
-    fig_salaries_grouped = px.bar(
-        faculty_salary_data_enhanced,
-        x="avg_faculty_salary",
-        y="institution_name",
-        color="type",  # Grouped by institution type
-        orientation="h",
-        title="Top Institutions by Faculty Salaries (Grouped by Type)",
-        labels={
-            "avg_faculty_salary": "Average Faculty Salary (USD)",
-            "institution_name": "Institution Name",
-            "type": "Institution Type"
-        },
-        height=500
-    )
-    st.plotly_chart(fig_salaries_grouped, use_container_width=True)
-
-    # Optional scatter plot for correlation
-    plot_title4 = "Correlation between Faculty Salaries and " + \
-        "Tuition Fees (In-State)"
-    fig_correlation = px.scatter(
-        faculty_salary_data_enhanced,
-        x="avg_faculty_salary",
-        y="in_state_tuition",
-        color="institution_name",
-        title=plot_title4,
-        labels={
-            "avg_faculty_salary": "Average Faculty Salary (USD)",
-            "in_state_tuition": "In-State Tuition (USD)",
-            "institution_name": "Name of Instiution"
-        },
-        height=500
-    )
-    st.plotly_chart(fig_correlation, use_container_width=True)
+        st.plotly_chart(fig_salaries_grouped, use_container_width=True)
+
+        # Optional scatter plot for correlation
+        plot_title4 = "Correlation between Faculty Salaries and " + \
+            "Tuition Fees (In-State)"
+        fig_correlation = px.scatter(
+            downcast(faculty_salary_data_enhanced),
+            x="avg_faculty_salary",
+            y="in_state_tuition",
+            color="institution_name",
+            title=plot_title4,
+            labels={
+                "avg_faculty_salary": "Average Faculty Salary (USD)",
+                "in_state_tuition": "In-State Tuition (USD)",
+                "institution_name": "Name of Instiution"
+            },
+            height=500
+        )
+        st.plotly_chart(fig_correlation, use_container_width=True)
+
+    else:
+        st.warning("No data available for enhanced faculty salaries analysis.")
+
+
+# Dashboard sections in display order
+SECTIONS = {
+    "Counts": analysis_institution_counts,
+    "Tuition": analysis_tuition,
+    "Repayment": analysis_repayment,
+    "Trends": analysis_trends,
+    "Correlation": analysis_correlation,
+    "Grad Debt": analysis_grad_debt,
+    "Salaries": analysis_faculty_salaries,
+}
+
+
+def main():
+    """
+    Renders the dashboard.
+    """
+    st.title("Team Olympia Dashboard")
+    st.write("Explore data about institutions across the United States.")
+
+    # Only the selected analysis runs its queries. Each one is a fragment,
+    # so changing a selector inside it reruns only that section.
+    section = st.radio("Analysis", list(SECTIONS), horizontal=True,
+                       key="section", label_visibility="collapsed")
+    SECTIONS[section]()
 
-else:
-    st.warning("No data available for enhanced faculty salaries analysis.")
+    # Footer
+    st.write("**Note:** All data is sourced from the College Scorecard "
+             "project.")
 
 
-# Footer
-st.write("**Note:** All data is sourced from the College Scorecard project.")
+if __name__ == "__main__":
+    main()
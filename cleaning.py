@@ -0,0 +1,33 @@
+# Per-field cleaning shared by the IPEDS and College Scorecard loaders.
+# This is the loaders' per-row hot path, typed so it can be compiled with
+# mypyc (see the README); without a build it runs as plain Python.
+from typing import Final, List, Optional, Sequence, Tuple
+
+# Missing, empty, or redacted markers, compared after stripping whitespace
+NULL_VALUES: Final = frozenset(('-999', '', '-2', 'NULL', 'PrivacySuppressed'))
+
+
+def clean_row(row: List[str], indices: Sequence[Optional[int]],
+              nulls: frozenset = NULL_VALUES) -> Tuple[Optional[str], ...]:
+    """
+    Cleans the given fields of a csv.reader row into a tuple.
+
+    Args:
+        row (list): A row from csv.reader.
+        indices (list): Field positions to extract, in output order; None
+            for columns the file does not have.
+        nulls (frozenset): Values to treat as missing.
+
+    Returns:
+        tuple: The stripped values, with missing or redacted ones as None.
+    """
+    values: List[Optional[str]] = []
+    # Bound once; the loop runs for every field of every row
+    append = values.append
+    for i in indices:
+        if i is None:
+            append(None)
+            continue
+        value = row[i].strip()
+        append(None if value in nulls else value)
+    return tuple(values)
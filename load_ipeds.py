@@ -1,42 +1,68 @@
-import psycopg
+import argparse
 import csv
-import sys
+import multiprocessing
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from functools import cache, lru_cache
+from itertools import repeat
+from psycopg_pool import ConnectionPool
 import credentials
+# Typed so it can be compiled with mypyc; see cleaning.py
+from cleaning import NULL_VALUES, clean_row
 
+try:
+    # Optional: parses the CSV column by column in C instead of a dict per row
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
 
-def connect_db():
-    """
-    Establishes a database connection using the credentials module.
+# Python conversions binary COPY needs, by PostgreSQL type OID (int2/4/8,
+# float4/8, numeric); text and varchar values are sent as they are
+BINARY_CONVERTERS = {21: int, 23: int, 20: int, 700: float, 701: float,
+                     1700: Decimal}
 
-    Returns:
-        psycopg.Connection: A connection object to interact with the
-        PostgreSQL database.
-    """
-    return psycopg.connect(
-        host=credentials.DB_HOST,
-        dbname=credentials.DB_NAME,
-        user=credentials.DB_USER,
-        password=credentials.DB_PASSWORD
-    )
+# IPEDS directory file names, e.g. hd2021.csv
+HD_FILENAME = re.compile(r'hd(\d{4})\.csv$')
 
+# Year prefix of Carnegie classification columns, e.g. C21 in C21BASIC
+CARNEGIE_PREFIX = re.compile(r'C\d{2}')
 
-def clean_data(row, columns):
-    """
-    Cleans and formats data from the row according to the required schema.
+# Created on first use, so importing this module opens no connections
+_pool = None
+
+
+def get_pool():
     """
-    cleaned_data = {}
-    for col in columns:
-        value = row.get(col)
-        if value is not None:
-            value = value.strip()
-        if value in ['-999', '', '-2', 'NULL', None, 'PrivacySuppressed']:
-            cleaned_data[col] = None
-        else:
-            cleaned_data[col] = value
-    return cleaned_data
+    Returns a connection pool shared by every load in this process.
 
+    Batch drivers that call load_ipeds_data once per year reuse the same
+    connections instead of reconnecting for each file.
 
+    Returns:
+        psycopg_pool.ConnectionPool: The loader's connection pool.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(
+            min_size=1,
+            max_size=4,
+            open=True,
+            kwargs={
+                "host": credentials.DB_HOST,
+                "dbname": credentials.DB_NAME,
+                "user": credentials.DB_USER,
+                "password": credentials.DB_PASSWORD,
+            },
+        )
+    return _pool
+
+
+@cache
 def extract_year_from_filename(filename):
     """
     Extracts the year from the filename.
@@ -47,18 +73,22 @@ def extract_year_from_filename(filename):
     Returns:
         int: The year extracted from the filename with format YYYY.
     """
-    match = re.search(r'hd(\d{4})\.csv$', filename)
+    match = HD_FILENAME.search(filename)
     if not match:
         raise ValueError("Filename must have format hdYYYY.csv")
     return int(match.group(1))
 
 
+@lru_cache(maxsize=8)
 def map_columns_by_year(columns, year):
     """
     Maps CSV column names to schema names based on the year.
 
+    Cached, so a batch of files sharing a header layout maps it once.
+
     Args:
-        columns (list): List of column names from the CSV file.
+        columns (tuple): Column names from the CSV file; a tuple so the
+            call can be cached.
         year (int): The academic year to determine year-specific prefixes.
 
     Returns:
@@ -72,8 +102,8 @@ def map_columns_by_year(columns, year):
         raise ValueError("Year not supported: Carnegie classifications "
                          "start from 2017.")
 
-    year_prefixes = {col[:3] for col in columns if col[:3].startswith("C") and
-                     col[1:3].isdigit()}
+    year_prefixes = {match.group() for col in columns
+                     if (match := CARNEGIE_PREFIX.match(col))}
 
     if target_prefix not in year_prefixes:
         print(f"Warning: Expected prefix {target_prefix} not found. "
@@ -103,72 +133,416 @@ def preload_unitids(cursor):
         cursor: The database cursor object.
 
     Returns:
-        set: A set of UNITID values from the Institutions table.
+        frozenset: The Institutions UNITID values as text, so CSV values
+        can be checked without converting every row to int.
     """
-    cursor.execute("SELECT UNITID FROM Institutions")
-    return set(row[0] for row in cursor.fetchall())
+    cursor.execute("SELECT UNITID::text FROM Institutions")
+    return frozenset(row[0] for row in cursor.fetchall())
 
 
-def batch_insert_location(cursor, addr_updates):
+def batch_insert_location(cursor):
     """
-    Batch inserts or updates the ADDR values in the Location table.
+    Upserts the staged ADDR values into the Location table.
+
+    Reads the ipeds_staging table filled by copy_ipeds, so the updates run
+    as one set-based statement instead of one statement per row.
 
     Args:
         cursor: The database cursor object.
-        addr_updates (list): A list of tuples containing UNITID and ADDR.
+
+    Returns:
+        int: The number of Location rows inserted or updated.
     """
-    print(f"Processing {len(addr_updates)} address updates...")
+    print("Processing staged address updates...")
     sql = """
         INSERT INTO Location (UNITID, ADDR)
-        VALUES (%s, %s)
+        SELECT DISTINCT ON (UNITID) UNITID, ADDR
+        FROM ipeds_staging
+        WHERE ADDR IS NOT NULL
         ON CONFLICT (UNITID)
         DO UPDATE SET ADDR = EXCLUDED.ADDR
         WHERE Location.ADDR IS NULL OR Location.ADDR = '';
     """
-    cursor.executemany(sql, addr_updates)
+    cursor.execute(sql)
     print("Address updates complete.")
+    return cursor.rowcount
+
+
+def iter_csv_records(reader, columns, row_columns, existing_unitids):
+    """
+    Cleans csv.reader rows lazily, one IPEDS record at a time.
+
+    Args:
+        reader: A csv.reader positioned after the header row.
+        columns (list): The header row.
+        row_columns (list): CSV columns for the IPEDS_Directory values, in
+            output order.
+        existing_unitids (frozenset): UNITID text values in Institutions.
+
+    Yields:
+        tuple: (UNITID, ADDR, values) for rows with a known UNITID, or
+        None for skipped rows.
+    """
+    # Resolve column positions once; rows are plain lists
+    positions = {col: i for i, col in enumerate(columns)}
+    width = len(columns)
+    unitid_index = positions.get("UNITID")
+    # ADDR first, then the IPEDS_Directory values, cleaned in one pass
+    record_indices = [positions["ADDR"]] + \
+        [positions.get(col) for col in row_columns]
+    # Bound to locals for the per-row loop
+    clean = clean_row
+    padding = [''] * width
+
+    for row in reader:
+        if not row:
+            # DictReader skips blank lines rather than counting them
+            continue
+        if len(row) < width:
+            # Short rows read as empty, as DictReader would
+            row += padding[len(row):]
+        # Stripped like the other fields, as the pyarrow path does
+        unitid = None if unitid_index is None \
+            else row[unitid_index].strip()
+        if unitid not in existing_unitids:
+            yield None
+            continue
+        cleaned = clean(row, record_indices)
+        yield unitid, cleaned[0], cleaned[1:]
+
+
+# Per-process settings for parse workers, set by _init_parse_worker
+_parse_settings = ()
+
+
+def _init_parse_worker(columns, row_columns, existing_unitids):
+    """
+    Stores the header and UNITID set once per worker process.
+    """
+    global _parse_settings
+    _parse_settings = (columns, row_columns, existing_unitids)
+
+
+def _parse_chunk(lines):
+    """
+    Parses a chunk of CSV lines in a worker process.
+
+    Args:
+        lines (list): Whole lines of the CSV file, without the header.
+
+    Returns:
+        list: The iter_csv_records output for these lines.
+    """
+    return list(iter_csv_records(csv.reader(lines), *_parse_settings))
+
+
+def iter_parallel_records(file, columns, row_columns, existing_unitids,
+                          workers, chunk_bytes=1 << 20):
+    """
+    Parses the rest of a CSV file across worker processes.
+
+    The file is split into chunks of whole lines, which assumes no quoted
+    field spans a line break (true of the IPEDS hd files). Records come
+    back in file order, and at most two chunks per worker are in flight.
+    Workers are spawned rather than forked, since the caller holds a pool
+    connection whose threads and sockets a forked child would inherit.
+
+    Args:
+        file: The open CSV file, positioned after the header row.
+        columns (list): The header row.
+        row_columns (list): CSV columns for the IPEDS_Directory values.
+        existing_unitids (frozenset): UNITID text values in Institutions.
+        workers (int): Number of parse processes.
+        chunk_bytes (int): Approximate size of each chunk.
+
+    Yields:
+        tuple: The same records as iter_csv_records.
+    """
+    with ProcessPoolExecutor(workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_parse_worker,
+                             initargs=(columns, row_columns,
+                                       existing_unitids)) as executor:
+        pending = deque()
+        for lines in iter(lambda: file.readlines(chunk_bytes), []):
+            pending.append(executor.submit(_parse_chunk, lines))
+            if len(pending) > workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def binary_copy_types(cursor, table, columns):
+    """
+    Looks up what a binary COPY into the given columns needs.
+
+    Binary COPY sends each value in its column's exact type, so the types
+    come from the catalog rather than being hard-coded here.
+
+    Args:
+        cursor: The database cursor object.
+        table (str): The table being copied into.
+        columns (list): The columns in COPY order.
+
+    Returns:
+        tuple: The type OIDs for copy.set_types(), and (position,
+        converter) pairs for the values that must leave Python as int,
+        float or Decimal rather than str.
+    """
+    cursor.execute("SELECT attname, atttypid FROM pg_attribute "
+                   "WHERE attrelid = %s::regclass "
+                   "AND attnum > 0 AND NOT attisdropped", (table,))
+    type_oids = {name.upper(): oid for name, oid in cursor.fetchall()}
+    oids = [type_oids[col.upper()] for col in columns]
+    conversions = [(i, BINARY_CONVERTERS[oid]) for i, oid in enumerate(oids)
+                   if oid in BINARY_CONVERTERS]
+    return oids, conversions
 
 
-def batch_insert_ipeds(cursor, data, columns, batch_size=1000):
+def copy_ipeds(cursor, records, columns, year):
     """
-    Inserts data into the IPEDS_Directory table in batches.
+    Streams records through a staging table into IPEDS_Directory.
+
+    Rows are written to a binary COPY as they are parsed, so the file is
+    never held in memory and numbers are not re-encoded as text. ADDR
+    travels in the same stream: a connection can only run one COPY at a
+    time, so it is staged next to the IPEDS_Directory values for
+    batch_insert_location to pick up.
+
+    Args:
+        cursor: The database cursor object.
+        records: An iterable of (UNITID, ADDR, values) tuples, with None
+            for skipped rows.
+        columns: A list of IPEDS_Directory column names for each row.
+        year (int): The data year written to every row.
+
+    Returns:
+        tuple: Rows read, rows copied, and rows with a NULL ADDR.
+    """
+    column_list = ', '.join(columns)
+    cursor.execute("CREATE TEMP TABLE ipeds_staging "
+                   "(LIKE IPEDS_Directory) ON COMMIT DROP")
+    cursor.execute("ALTER TABLE ipeds_staging ADD COLUMN ADDR text")
+
+    oids, conversions = binary_copy_types(cursor, "ipeds_staging",
+                                          columns + ["ADDR"])
+    # YEAR is already an int; the CSV values are all strings
+    conversions = [(i, convert) for i, convert in conversions if i > 0]
+
+    rows_read = rows_copied = null_addr_count = 0
+    with cursor.copy(f"COPY ipeds_staging ({column_list}, ADDR) "
+                     "FROM STDIN (FORMAT BINARY)") as copy:
+        copy.set_types(oids)
+        for record in records:
+            rows_read += 1
+            if record is None:
+                continue
+            unitid, addr_value, values = record
+            row = [year, unitid, *values, addr_value]
+            for i, convert in conversions:
+                if row[i] is not None:
+                    row[i] = convert(row[i])
+            copy.write_row(row)
+            rows_copied += 1
+            if addr_value is None:
+                null_addr_count += 1
+
+    cursor.execute(f"INSERT INTO IPEDS_Directory ({column_list}) "
+                   f"SELECT {column_list} FROM ipeds_staging")
+    return rows_read, rows_copied, null_addr_count
+
+
+def clean_arrow_batch(batch, columns):
+    """
+    Applies the clean_row rules to whole pyarrow string columns.
+
+    Args:
+        batch (pyarrow.RecordBatch): A block of CSV string columns.
+        columns (list): The columns to clean, in output order.
+
+    Returns:
+        pyarrow.RecordBatch: The stripped columns, with missing or
+        redacted values as nulls.
+    """
+    null_values = pa.array(sorted(NULL_VALUES))
+    cleaned = []
+    for col in columns:
+        values = pc.utf8_trim_whitespace(batch.column(col))
+        cleaned.append(pc.if_else(
+            pc.is_in(values, value_set=null_values),
+            pa.scalar(None, pa.string()), values))
+    return pa.RecordBatch.from_arrays(cleaned, names=columns)
+
+
+def read_ipeds_arrow(file_path, columns, existing_unitids,
+                     block_size=8 << 20):
+    """
+    Streams and cleans the given CSV columns with pyarrow.
+
+    Applies the same rules as clean_row to whole columns at once and keeps
+    only rows whose UNITID is in existing_unitids. The file is parsed one
+    block at a time, so memory is bounded by block_size, not file size.
+
+    Args:
+        file_path (str): The path to the CSV file to read.
+        columns (list): CSV columns to read; must include UNITID and ADDR.
+        existing_unitids (frozenset): UNITID text values in Institutions.
+        block_size (int): Bytes of CSV parsed per batch.
+
+    Yields:
+        tuple: The number of rows in a block and a pyarrow.RecordBatch of
+        its cleaned string columns for the kept rows.
+    """
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(encoding='ISO-8859-1',
+                                       block_size=block_size),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columns,
+            column_types={col: pa.string() for col in columns},
+            # Null markers are matched after stripping, below
+            null_values=[], strings_can_be_null=False))
+    known_unitids = pa.array(list(existing_unitids), pa.string())
+    for batch in reader:
+        cleaned = clean_arrow_batch(batch, columns)
+        known = pc.is_in(cleaned.column("UNITID"), value_set=known_unitids)
+        yield batch.num_rows, cleaned.filter(pc.fill_null(known, False))
+
+
+def iter_arrow_records(batches, row_columns):
+    """
+    Converts read_ipeds_arrow batches to records one batch at a time.
+
+    Args:
+        batches: The (rows read, RecordBatch) pairs from read_ipeds_arrow.
+        row_columns (list): CSV columns for the IPEDS_Directory values, in
+            output order; columns missing from the file read as None.
+
+    Yields:
+        tuple: (UNITID, ADDR, values) or None, as from iter_csv_records.
+    """
+    for rows_read, batch in batches:
+        missing = [None] * batch.num_rows
+        values = [batch.column(col).to_pylist()
+                  if col in batch.schema.names else missing
+                  for col in row_columns]
+        yield from zip(batch.column("UNITID").to_pylist(),
+                       batch.column("ADDR").to_pylist(), zip(*values))
+        # Skipped rows, so copy_ipeds counts every row read
+        yield from repeat(None, rows_read - batch.num_rows)
+
+
+def drop_secondary_indexes(cursor, table):
+    """
+    Drops a table's non-unique indexes ahead of a bulk load.
+
+    Building an index once after the load is cheaper than updating it for
+    every row. The primary key and unique indexes are kept, since they
+    enforce constraints. Run inside the load's transaction, so a rollback
+    restores the dropped indexes.
+
+    Args:
+        cursor: The database cursor object.
+        table (str): The table about to be loaded.
+
+    Returns:
+        list: CREATE INDEX statements for restore_indexes.
+    """
+    cursor.execute("""
+        SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)
+        FROM pg_index
+        WHERE indrelid = %s::regclass AND NOT indisunique
+    """, (table,))
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+    return [definition for _, definition in indexes]
+
+
+def restore_indexes(cursor, definitions):
+    """
+    Recreates indexes dropped by drop_secondary_indexes.
 
     Args:
         cursor: The database cursor object.
-        data: A list of tuples representing rows of data to insert.
-        columns: A list of column names corresponding to the data.
-        batch_size: The size of each batch for insertion.
+        definitions (list): CREATE INDEX statements to run.
     """
-    placeholders = ', '.join(['%s'] * len(columns))
-    sql = f"INSERT INTO IPEDS_Directory ({', '.join(columns)}) VALUES " \
-          f"({placeholders})"
-    for i in range(0, len(data), batch_size):
-        cursor.executemany(sql, data[i:i + batch_size])
+    if definitions:
+        # Sort-based index builds go faster with more memory
+        cursor.execute("SET LOCAL maintenance_work_mem = '1GB'")
+    for definition in definitions:
+        cursor.execute(definition)
+
 
+def refresh_summary_view():
+    """
+    Refreshes the vw_year_summary materialized view used by the dashboard.
 
-def load_ipeds_data(file_path):
+    Call it after the load has committed, once per batch of files. With
+    the view's unique index from migrations/create_views.sql the refresh
+    runs CONCURRENTLY, so dashboard queries keep reading the old contents
+    meanwhile; without it, it falls back to a plain refresh. Does nothing
+    if the view has not been created.
+    """
+    with get_pool().connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_index
+                WHERE indrelid = view.oid AND indisunique)
+            FROM (SELECT to_regclass('vw_year_summary') AS oid) AS view
+            WHERE view.oid IS NOT NULL
+        """)
+        row = cursor.fetchone()
+        if row is None:
+            return
+        print("\nRefreshing vw_year_summary...")
+        concurrently = "CONCURRENTLY " if row[0] else ""
+        cursor.execute(
+            f"REFRESH MATERIALIZED VIEW {concurrently}vw_year_summary")
+
+
+def load_ipeds_data(file_path, workers=1, rebuild_indexes=False):
     """
     Loads IPEDS data and updates the Location and IPEDS_Directory tables.
 
     Args:
         file_path (str): The path to the CSV file to load.
+        workers (int): Processes used to parse the CSV when pyarrow is not
+            installed; 1 parses in this process. Ignored, with a warning,
+            when pyarrow is installed.
+        rebuild_indexes (bool): Drop IPEDS_Directory's secondary indexes
+            for the load and rebuild them afterwards. Worth it for an
+            initial load; adding one year to existing data is cheaper with
+            the indexes in place, and the drop blocks dashboard reads
+            until commit.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
     year = extract_year_from_filename(file_path)
     data_year = year
 
     try:
-        existing_unitids = preload_unitids(cursor)
-
-        with open(file_path, mode='r', encoding='ISO-8859-1') as file:
-            reader = csv.DictReader(file)
-            available_columns = reader.fieldnames
+        # The transaction commits on success and rolls back on any error
+        with get_pool().connection() as conn, conn.transaction(), \
+                conn.cursor() as cursor, \
+                open(file_path, mode='r', encoding='ISO-8859-1',
+                     buffering=1 << 20, newline='') as file:
+            if hasattr(os, "posix_fadvise"):
+                # The file is read front to back once; ask for readahead
+                os.posix_fadvise(file.fileno(), 0, 0,
+                                 os.POSIX_FADV_SEQUENTIAL)
+            # Loader-only settings, reset when the transaction ends. A crash
+            # right after commit can lose the load, which is simply rerun.
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            cursor.execute("SET LOCAL work_mem = '256MB'")
+            existing_unitids = preload_unitids(cursor)
+
+            reader = csv.reader(file)
+            available_columns = next(reader)
 
             if "ADDR" not in available_columns:
                 raise ValueError("ADDR column missing from CSV file.")
 
-            mapped_columns = map_columns_by_year(available_columns, year)
+            mapped_columns = map_columns_by_year(tuple(available_columns),
+                                                 year)
             static_columns = ["CBSA", "CBSATYPE", "CSA", "LATITUDE",
                               "LONGITUD"]
             addr_column = "ADDR"
@@ -176,65 +550,76 @@ def load_ipeds_data(file_path):
             ipeds_directory_cols = yr_id_cols + static_columns + \
                 list(mapped_columns.keys())
 
-            ipeds_data = []
-            addr_updates = []
-            skipped_records = 0
-            total_rows = 0
-            null_addr_count = 0
-
-            for row in reader:
-                total_rows += 1
-                unitid = row.get("UNITID")
-                if not unitid or int(unitid) not in existing_unitids:
-                    skipped_records += 1
-                    continue
-
-                cleaned_row = clean_data(row, available_columns)
-                addr_value = cleaned_row.get(addr_column)
-                if addr_value is None:
-                    null_addr_count += 1
-
-                row_data = [data_year, unitid] + \
-                    [cleaned_row.get(col, None) for col in static_columns] + \
-                    [cleaned_row.get(mapped_columns[col], None)
-                     for col in mapped_columns.keys()]
-                ipeds_data.append(tuple(row_data))
-
-                if addr_value:
-                    addr_updates.append((unitid, addr_value))
+            # CSV columns holding the IPEDS_Directory values, in order
+            row_columns = static_columns + \
+                [mapped_columns[col] for col in mapped_columns.keys()]
+
+            if pa is not None:
+                if workers > 1:
+                    print("Warning: pyarrow is installed, so the CSV is "
+                          "parsed by pyarrow and workers is ignored.")
+                csv_columns = ["UNITID", addr_column] + \
+                    [col for col in static_columns
+                     if col in available_columns] + \
+                    list(mapped_columns.values())
+                records = iter_arrow_records(
+                    read_ipeds_arrow(file_path, csv_columns,
+                                     existing_unitids), row_columns)
+            elif workers > 1:
+                records = iter_parallel_records(file, available_columns,
+                                                row_columns,
+                                                existing_unitids, workers)
+            else:
+                records = iter_csv_records(reader, available_columns,
+                                           row_columns, existing_unitids)
+
+            dropped_indexes = []
+            if rebuild_indexes:
+                dropped_indexes = drop_secondary_indexes(cursor,
+                                                         "IPEDS_Directory")
+            print("\nCopying records into IPEDS_Directory table...")
+            rows_read, rows_copied, null_addr_count = copy_ipeds(
+                cursor, records, ipeds_directory_cols, data_year)
+            restore_indexes(cursor, dropped_indexes)
+            skipped_records = rows_read - rows_copied
+            addr_count = rows_copied - null_addr_count
 
             print("\nSummary:")
-            print(f"- Total rows read from CSV: {total_rows}")
+            print(f"- Total rows read from CSV: {rows_read}")
             print(f"- Total rows skipped: {skipped_records}")
-            print(f"- Total rows prepared for IPEDS_Directory: "
-                  f"{len(ipeds_data)}")
-            print(f"- Total ADDR updates for Location: {len(addr_updates)}")
+            print(f"- Total rows copied into IPEDS_Directory: {rows_copied}")
+            print(f"- Total ADDR updates for Location: {addr_count}")
             print(f"- Rows with NULL ADDR values: {null_addr_count}")
 
-            if addr_updates:
-                print(f"\nUpdating {len(addr_updates)} records in "
+            if addr_count:
+                print(f"\nUpdating {addr_count} records in "
                       f"Location table...")
-                batch_insert_location(cursor, addr_updates)
+                batch_insert_location(cursor)
 
-            if ipeds_data:
-                print(f"\nInserting {len(ipeds_data)} records into "
-                      f"IPEDS_Directory table...")
-                batch_insert_ipeds(cursor, ipeds_data, ipeds_directory_cols)
-
-            conn.commit()
-            print("\nIPEDS data loaded successfully.")
+        print("\nIPEDS data loaded successfully.")
 
     except Exception as e:
-        conn.rollback()
         print(f"Error: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+        return
 
+    # The load has committed; a failed refresh is rerun on its own
+    try:
+        refresh_summary_view()
+    except Exception as e:
+        print(f"Data loaded; vw_year_summary refresh failed: {e}")
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python load_ipeds.py <csv_file>")
-        sys.exit(1)
 
-    load_ipeds_data(sys.argv[1])
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load an IPEDS directory CSV file into the database.")
+    parser.add_argument("csv_file", help="hdYYYY.csv file to load")
+    parser.add_argument("workers", nargs="?", type=int, default=1,
+                        help="CSV parse processes (default 1); ignored "
+                             "when pyarrow is installed")
+    parser.add_argument("--rebuild-indexes", action="store_true",
+                        help="drop secondary indexes for the load and "
+                             "rebuild them after; for initial loads")
+    args = parser.parse_args()
+    load_ipeds_data(args.csv_file, args.workers,
+                    rebuild_indexes=args.rebuild_indexes)
+    get_pool().close()
@@ -1,49 +1,26 @@
 import psycopg
+import argparse
 import csv
-import sys
+import logging
+import os
 import re
-import credentials
+from itertools import islice
+from cleaning import clean_row
+from load_ipeds import (binary_copy_types, clean_arrow_batch,
+                        drop_secondary_indexes, get_pool,
+                        refresh_summary_view, restore_indexes)
 
+try:
+    # Optional: parses and cleans the CSV column by column in C
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
 
-def connect_db():
-    """
-    Establishes a database connection using the credentials module.
-
-    Returns:
-        psycopg.Connection: A connection object to interact with the
-        PostgreSQL database.
-    """
-    return psycopg.connect(
-        host=credentials.DB_HOST,
-        dbname=credentials.DB_NAME,
-        user=credentials.DB_USER,
-        password=credentials.DB_PASSWORD
-    )
-
+log = logging.getLogger(__name__)
 
-def clean_data(row, columns):
-    """
-    Cleans and formats data from the row according to the required schema.
-
-    Args:
-        row (dict): A dictionary representing a row of data.
-        columns (list): A list of columns to extract and clean data for.
-
-    Returns:
-        dict: A dictionary containing cleaned and formatted data for the
-        specified columns.
-    """
-    cleaned_data = {}
-    for col in columns:
-        value = row.get(col)
-        if value is not None:
-            value = value.strip()
-        # Convert missing, empty, or redacted values to None
-        if value in ['-999', '', '-2', 'NULL', None, 'PrivacySuppressed']:
-            cleaned_data[col] = None
-        else:
-            cleaned_data[col] = value
-    return cleaned_data
+# College Scorecard file names, e.g. MERGED2019_20_PP.csv
+MERGED_FILENAME = re.compile(r'MERGED(\d{4})_(\d{2})_')
 
 
 def extract_year_from_filename(filename):
@@ -56,7 +33,7 @@ def extract_year_from_filename(filename):
     Returns:
         int: The academic end year in the format YYYY.
     """
-    match = re.search(r'MERGED(\d{4})_(\d{2})_', filename)
+    match = MERGED_FILENAME.search(filename)
     if not match:
         raise ValueError("Filename must have format MERGEDYYYY_YY_*.csv")
 
@@ -67,147 +44,463 @@ def extract_year_from_filename(filename):
     return end_year
 
 
-def insert_data(cursor, table, data, columns):
+# Target tables in load order (parents before child tables) and the
+# columns each one takes from a Scorecard row
+TABLE_COLUMNS = {
+    "Institutions": [
+        "UNITID", "OPEID", "INSTNM", "CONTROL", "ACCREDAGENCY",
+        "PREDDEG", "HIGHDEG"
+    ],
+    "Location": [
+        "UNITID", "REGION", "ST_FIPS", "ADDR", "CITY", "STABBR", "ZIP"
+    ],
+    "Financial_Data": [
+        "YEAR", "UNITID", "TUITIONFEE_IN", "TUITIONFEE_OUT",
+        "TUITIONFEE_PROG", "TUITFTE", "AVGFACSAL", "CDR2", "CDR3"
+    ],
+    "Admissions_Data": [
+        "YEAR", "UNITID", "ADM_RATE", "GRAD_DEBT_MDN", "SATMTMID",
+        "ACTMTMID"
+    ],
+}
+
+# How load_many writes rows: staged with COPY, or insert_data's fallbacks
+LOAD_METHODS = ("copy", "pipeline", "values")
+
+# CSV columns staged once per row; YEAR comes from the filename instead
+CSV_COLUMNS = list(dict.fromkeys(
+    col for columns in TABLE_COLUMNS.values() for col in columns
+    if col != "YEAR"))
+
+
+def create_scorecard_staging(cursor):
+    """
+    Creates the scorecard_staging table every row is copied into.
+
+    It holds YEAR plus the union of the four tables' columns, each typed
+    like the table it comes from, so one COPY pass feeds all four.
+
+    Args:
+        cursor (psycopg.Cursor): The database cursor object.
+    """
+    sources = {}
+    for table, columns in TABLE_COLUMNS.items():
+        for col in columns:
+            sources.setdefault(col, table)
+    select_list = ', '.join(f"{sources[col]}.{col}"
+                            for col in ["YEAR"] + CSV_COLUMNS)
+    cursor.execute(f"CREATE TEMP TABLE scorecard_staging ON COMMIT DROP AS "
+                   f"SELECT {select_list} "
+                   f"FROM {', '.join(TABLE_COLUMNS)} WITH NO DATA")
+
+
+def iter_csv_rows(reader, header):
+    """
+    Cleans the staged columns of each csv.reader row.
+
+    Fields are picked by position, with the header positions looked up
+    once per file. Blank lines are skipped and short rows padded with
+    empty fields, as csv.DictReader did.
+
+    Args:
+        reader (csv.reader): The Scorecard CSV rows after the header.
+        header (list): The header row.
+
+    Yields:
+        tuple: The cleaned CSV_COLUMNS values of one row.
+    """
+    positions = {col: i for i, col in enumerate(header)}
+    indices = [positions.get(col) for col in CSV_COLUMNS]
+    width = len(header)
+    # Bound to locals for the per-row loop
+    clean = clean_row
+    padding = [''] * width
+    for row in reader:
+        if not row:
+            # Blank lines hold no record; DictReader skipped them too
+            continue
+        if len(row) < width:
+            # Short rows read as empty, as DictReader would
+            row += padding[len(row):]
+        yield clean(row, indices)
+
+
+def iter_arrow_rows(file_path, header, block_size=8 << 20):
+    """
+    Parses and cleans the staged columns with pyarrow, a block at a time.
+
+    pyarrow rejects rows with the wrong number of fields, so those are
+    set aside and cleaned by iter_csv_rows instead; both paths yield the
+    same rows for the same file.
+
+    Args:
+        file_path (str): The path to the Scorecard CSV file.
+        header (list): The header row.
+        block_size (int): Bytes of CSV parsed per batch.
+
+    Yields:
+        tuple: The cleaned CSV_COLUMNS values of one row, as from
+        iter_csv_rows.
+    """
+    invalid_rows = []
+
+    def set_aside(row):
+        invalid_rows.append(row.text)
+        return 'skip'
+
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(encoding='ISO-8859-1',
+                                       block_size=block_size),
+        # Quoted fields may span lines, as csv.reader allows
+        parse_options=pacsv.ParseOptions(newlines_in_values=True,
+                                         invalid_row_handler=set_aside),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=CSV_COLUMNS, include_missing_columns=True,
+            column_types={col: pa.string() for col in CSV_COLUMNS},
+            # Null markers are matched after stripping
+            null_values=[], strings_can_be_null=False))
+    for batch in reader:
+        cleaned = clean_arrow_batch(batch, CSV_COLUMNS)
+        yield from zip(*(column.to_pylist() for column in cleaned.columns))
+        if invalid_rows:
+            texts = invalid_rows[:]
+            del invalid_rows[:len(texts)]
+            yield from iter_csv_rows(csv.reader(texts), header)
+    yield from iter_csv_rows(csv.reader(invalid_rows), header)
+
+
+def stage_scorecard(cursor, rows, year):
+    """
+    Streams cleaned CSV rows into scorecard_staging with a binary COPY.
+
+    Rows go to the server as they are read, so no per-table lists are
+    built in memory.
+
+    Args:
+        cursor (psycopg.Cursor): The database cursor object.
+        rows: Cleaned CSV_COLUMNS tuples, from iter_csv_rows or
+            iter_arrow_rows.
+        year (int): The academic end year written to every row.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    columns = ["YEAR"] + CSV_COLUMNS
+    oids, conversions = binary_copy_types(cursor, "scorecard_staging",
+                                          columns)
+    row_count = 0
+    with cursor.copy(f"COPY scorecard_staging ({', '.join(columns)}) "
+                     "FROM STDIN (FORMAT BINARY)") as copy:
+        copy.set_types(oids)
+        for row in rows:
+            row_count += 1
+            try:
+                values = [year, *row]
+                for i, convert in conversions:
+                    if values[i] is not None:
+                        values[i] = convert(values[i])
+            except Exception as e:
+                raise ValueError(f"Error processing row {row_count}: {e}")
+            copy.write_row(values)
+    return row_count
+
+
+def merge_scorecard(cursor):
+    """
+    Inserts the staged rows into the four Scorecard tables.
+
+    Existing rows are skipped with ON CONFLICT DO NOTHING, as before. The
+    tables without a YEAR column take one row per UNITID, from the
+    earliest staged year, so UNITIDs repeated across load_many files are
+    not conflict-checked once per year. Rows are inserted in primary key
+    order, so the B-tree inserts walk the index instead of touching
+    random pages. The four statements go out in one pipeline, so the
+    client waits for the server once rather than once per table.
+
+    Args:
+        cursor (psycopg.Cursor): The database cursor object.
+
+    Returns:
+        dict: The number of rows inserted into each table.
     """
-    Inserts data into the specified table.
+    conn = cursor.connection
+    cursors = {}
+    # Statements run in order on this connection, parents first
+    with conn.pipeline():
+        for table, columns in TABLE_COLUMNS.items():
+            column_list = ', '.join(columns)
+            if "YEAR" in columns:
+                select = (f"SELECT {column_list} FROM scorecard_staging "
+                          "ORDER BY YEAR, UNITID")
+            else:
+                select = (f"SELECT DISTINCT ON (UNITID) {column_list} "
+                          "FROM scorecard_staging ORDER BY UNITID, YEAR")
+            log.debug("Inserting staged rows into %s table...", table)
+            cursors[table] = conn.cursor()
+            cursors[table].execute(f"INSERT INTO {table} ({column_list}) "
+                                   f"{select} ON CONFLICT DO NOTHING")
+    inserted = {}
+    for table, table_cursor in cursors.items():
+        inserted[table] = table_cursor.rowcount
+        table_cursor.close()
+    return inserted
+
+
+def insert_data(cursor, table, data, columns, method="copy",
+                page_size=1000):
+    """
+    Inserts data into the specified table, skipping rows that already
+    exist.
+
+    By default rows are streamed with a binary COPY into a temporary table
+    shaped like the target, then merged with INSERT ... ON CONFLICT DO
+    NOTHING, since COPY itself has no conflict handling. For servers or
+    middleware that rule COPY out, "pipeline" sends one prepared INSERT
+    per row in a pipeline, and "values" sends multi-row INSERT ... VALUES
+    statements of page_size rows, with the values bound client-side.
 
     Args:
         cursor (psycopg.Cursor): The database cursor object.
         table (str): The name of the table to insert data into.
-        data (list of tuple): A list of tuples representing rows of data
-            to insert.
+        data (iterable of tuple): Rows of data to insert; consumed once.
         columns (list): A list of columns corresponding to the data.
+        method (str): "copy", "pipeline" or "values".
+        page_size (int): Rows per statement for the "values" method.
     """
-    placeholders = ', '.join(['%s'] * len(columns))  # Generate placeholders
-    sql = (
-        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
-        "ON CONFLICT DO NOTHING"
-    )
-    print(f"Executing SQL: {sql}")  # Debugging: print SQL statement for review
-    print(f"Data sample: {data[0]}")  # Debugging: print the
+    if method not in ("copy", "pipeline", "values"):
+        raise ValueError(f"Unknown insert method: {method}")
+    column_list = ', '.join(columns)
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+    if method in ("pipeline", "values"):
+        sql = f"INSERT INTO {table} ({column_list}) VALUES {{}} " \
+            "ON CONFLICT DO NOTHING"
+        log.debug("Executing SQL: %s", sql.format(placeholders))
+        try:
+            if method == "pipeline":
+                with cursor.connection.pipeline():
+                    for row in data:
+                        cursor.execute(sql.format(placeholders), row,
+                                       prepare=True)
+                return
+            # One round trip per page instead of per row
+            with psycopg.ClientCursor(cursor.connection) as client_cursor:
+                rows = iter(data)
+                while page := list(islice(rows, page_size)):
+                    values = ', '.join(
+                        client_cursor.mogrify(placeholders, row)
+                        for row in page)
+                    client_cursor.execute(sql.format(values))
+        except Exception as e:
+            raise Exception(
+                f"DB error during insertion into {table}: {str(e)}") from e
+        return
+
+    staging = f"staging_{table.lower()}"
+    sql = f"COPY {staging} ({column_list}) FROM STDIN (FORMAT BINARY)"
+    log.debug("Executing SQL: %s", sql)
     try:
-        cursor.executemany(sql, data)
+        cursor.execute(f"CREATE TEMP TABLE {staging} (LIKE {table}) "
+                       "ON COMMIT DROP")
+        oids, conversions = binary_copy_types(cursor, staging, columns)
+        with cursor.copy(sql) as copy:
+            copy.set_types(oids)
+            for row in data:
+                row = list(row)
+                for i, convert in conversions:
+                    if row[i] is not None:
+                        row[i] = convert(row[i])
+                copy.write_row(row)
+        cursor.execute(f"INSERT INTO {table} ({column_list}) "
+                       f"SELECT {column_list} FROM {staging} "
+                       "ON CONFLICT DO NOTHING")
+        cursor.execute(f"DROP TABLE {staging}")
     except Exception as e:
-        raise Exception(f"DB error during insertion into {table}: {str(e)}")
+        raise Exception(
+            f"DB error during insertion into {table}: {str(e)}") from e
 
 
-def load_scorecard_data(file_path):
+def iter_file_rows(file_path):
     """
-    Loads and inserts College Scorecard data into the database.
+    Reads and cleans the staged columns of one Scorecard CSV file.
 
     Args:
-        file_path (str): The path to the CSV file containing the College
-            Scorecard data.
+        file_path (str): The path to the CSV file.
+
+    Yields:
+        tuple: The cleaned CSV_COLUMNS values of one row.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-    year = extract_year_from_filename(file_path)
+    # A 1 MiB buffer means far fewer read calls than the 8 KiB default
+    with open(file_path, mode='r', encoding='ISO-8859-1',
+              buffering=1 << 20, newline='') as file:
+        if hasattr(os, "posix_fadvise"):
+            # The file is read front to back once; ask for readahead
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        reader = csv.reader(file)
+        header = next(reader)
+        if pa is not None:
+            # pyarrow reads the file itself, in large blocks
+            yield from iter_arrow_rows(file_path, header)
+        else:
+            yield from iter_csv_rows(reader, header)
 
-    try:
-        with open(file_path, mode='r', encoding='ISO-8859-1') as file:
-            reader = csv.DictReader(file)
-
-            institutions_columns = [
-                "UNITID", "OPEID", "INSTNM", "CONTROL", "ACCREDAGENCY",
-                "PREDDEG", "HIGHDEG"
-            ]
-            location_columns = [
-                "UNITID", "REGION", "ST_FIPS", "ADDR", "CITY",
-                "STABBR", "ZIP"
-            ]
-            financial_data_columns = [
-                "UNITID", "TUITIONFEE_IN", "TUITIONFEE_OUT", "TUITIONFEE_PROG",
-                "TUITFTE", "AVGFACSAL", "CDR2", "CDR3"
-            ]
-            admissions_data_columns = [
-                "UNITID", "ADM_RATE", "GRAD_DEBT_MDN", "SATMTMID", "ACTMTMID"
-            ]
-
-            institutions_data = []
-            location_data = []
-            financial_data = []
-            admissions_data = []
 
+def stage_file(cursor, file_path, year):
+    """
+    Copies one Scorecard CSV file into scorecard_staging.
+
+    Args:
+        cursor (psycopg.Cursor): The database cursor object.
+        file_path (str): The path to the CSV file.
+        year (int): The academic end year of the file.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    log.debug("Copying %s into the staging table...", file_path)
+    return stage_scorecard(cursor, iter_file_rows(file_path), year)
+
+
+def insert_file(cursor, file_path, year, method, page_size=1000):
+    """
+    Inserts one Scorecard CSV file without a staging table.
+
+    Rows are read page_size at a time and each page is inserted into the
+    four tables in load order with insert_data, so parents always land
+    before their child rows.
+
+    Args:
+        cursor (psycopg.Cursor): The database cursor object.
+        file_path (str): The path to the CSV file.
+        year (int): The academic end year of the file.
+        method (str): The insert_data method, "pipeline" or "values".
+        page_size (int): Rows read and inserted per page.
+
+    Returns:
+        int: The number of rows read.
+    """
+    log.debug("Inserting %s with %s inserts...", file_path, method)
+    staged_columns = ["YEAR"] + CSV_COLUMNS
+    table_indices = {
+        table: [staged_columns.index(col) for col in columns]
+        for table, columns in TABLE_COLUMNS.items()}
+    rows = iter_file_rows(file_path)
+    row_count = 0
+    while page := [(year, *row) for row in islice(rows, page_size)]:
+        row_count += len(page)
+        for table, indices in table_indices.items():
+            insert_data(cursor, table,
+                        [tuple(row[i] for i in indices) for row in page],
+                        TABLE_COLUMNS[table], method=method,
+                        page_size=page_size)
+    return row_count
+
+
+def load_many(file_paths, skip_triggers=False, method="copy",
+              page_size=1000, rebuild_indexes=False):
+    """
+    Loads several College Scorecard files in a single transaction.
+
+    Every file is copied into one staging table on one connection, then
+    merged and committed once. If any file fails, the whole batch is
+    rolled back, including files that were read without error. Where
+    COPY is not allowed, method "pipeline" or "values" inserts the rows
+    with insert_data instead of staging them.
+
+    Args:
+        file_paths (list): Paths to MERGEDYYYY_YY_*.csv files, loaded in
+            the given order.
+        skip_triggers (bool): Run the load with session_replication_role
+            set to replica, which skips the foreign key checks and any
+            other triggers on the tables. Needs superuser.
+        method (str): "copy", "pipeline" or "values".
+        page_size (int): Rows per page, and per multi-row INSERT, for the
+            "pipeline" and "values" methods.
+        rebuild_indexes (bool): Drop the four tables' secondary indexes
+            for the load and rebuild them once afterwards. Worth it for
+            an initial load into empty tables; for the usual one new year
+            on top of existing data, updating the indexes is cheaper, and
+            the drop locks the tables against dashboard reads until the
+            load commits.
+    """
+    if method not in LOAD_METHODS:
+        raise ValueError(f"Unknown load method: {method}")
+    years = [extract_year_from_filename(path) for path in file_paths]
+
+    try:
+        # The transaction commits on success and rolls back on any error
+        with get_pool().connection() as conn, conn.transaction(), \
+                conn.cursor() as cursor:
+            if skip_triggers:
+                # Safe for the foreign keys: every row's UNITID goes into
+                # Institutions before its child rows
+                cursor.execute("SET LOCAL session_replication_role = replica")
+            dropped_indexes = []
+            if rebuild_indexes:
+                dropped_indexes = [definition for table in TABLE_COLUMNS
+                                   for definition in
+                                   drop_secondary_indexes(cursor, table)]
             row_count = 0
-            skipped_rows = 0
-            for row in reader:
-                row_count += 1
-                try:
-                    # Prepare data for each table
-                    institution_row = clean_data(row, institutions_columns)
-                    institutions_data.append(tuple(institution_row.values()))
-
-                    location_row = clean_data(row, location_columns)
-                    location_data.append(tuple(location_row.values()))
-
-                    financial_row = clean_data(row, financial_data_columns)
-                    financial_data.append(
-                        (year,) + tuple(financial_row.values())
-                        )
-                    # YEAR added here
-
-                    admissions_row = clean_data(row, admissions_data_columns)
-                    admissions_data.append(
-                        (year,) + tuple(admissions_row.values()))
-                except Exception as e:
-                    print(f"Error processing row {row_count}: {row}")
-                    print(f"Error details: {e}")
-                    skipped_rows += 1
-                    conn.rollback()
-                    sys.exit(1)
-                # YEAR added here
-
-            # Insert data in batch
-            if institutions_data:
-                print(f"Inserting {len(institutions_data)} \
-                      rows into Institutions table...")
-                insert_data(cursor, "Institutions",
-                            institutions_data, institutions_columns)
-
-            if location_data:
-                print(f"Inserting {len(location_data)} \
-                      rows into Location table...")
-                insert_data(cursor, "Location",
-                            location_data, location_columns)
-
-            if financial_data:
-                print(f"Inserting {len(financial_data)} \
-                      rows into Financial_Data table...")
-                insert_data(cursor, "Financial_Data", financial_data,
-                            ["YEAR"] + financial_data_columns)
-
-            if admissions_data:
-                print(f"Inserting {len(admissions_data)} \
-                      rows into Admissions_Data table...")
-                insert_data(cursor, "Admissions_Data", admissions_data,
-                            ["YEAR"] + admissions_data_columns)
-
-            conn.commit()
-            print("Summary:")
-            print(f"Total rows read from CSV: {row_count}")
-            print(f"Rows skipped due to errors: {skipped_rows}")
-            print(f"Rows successfully inserted "
-                  f" into Institutions: {len(institutions_data)}")
-            print(f"Rows successfully inserted"
-                  f" into Location: {len(location_data)}")
-            print(f"Rows successfully inserted"
-                  f" into Financial_Data: {len(financial_data)}")
-            print(f"Rows successfully inserted"
-                  f" into Admissions_Data: {len(admissions_data)}")
-            print("Data from College Scorecard loaded successfully.")
+            inserted = {}
+            if method == "copy":
+                create_scorecard_staging(cursor)
+                for file_path, year in zip(file_paths, years):
+                    row_count += stage_file(cursor, file_path, year)
+                inserted = merge_scorecard(cursor)
+            else:
+                for file_path, year in zip(file_paths, years):
+                    row_count += insert_file(cursor, file_path, year,
+                                             method, page_size)
+            restore_indexes(cursor, dropped_indexes)
+
+        log.info("Summary:")
+        log.info("Total rows read from CSV: %d", row_count)
+        for table, count in inserted.items():
+            log.info("Rows inserted into %s: %d", table, count)
+        log.info("Data from College Scorecard loaded successfully.")
+
+    except Exception as e:
+        log.error("Error: %s", e)
+        return
 
+    # The load has committed; a failed refresh is rerun on its own
+    try:
+        refresh_summary_view()
     except Exception as e:
-        print(f"Error processing row {row_count}: {row}")
-        print(f"Error details: {e}")
-        conn.rollback()
-        print(f"Error: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+        log.error("Data loaded; vw_year_summary refresh failed: %s", e)
+
+
+def load_scorecard_data(file_path, method="copy"):
+    """
+    Loads and inserts College Scorecard data into the database.
+
+    Args:
+        file_path (str): The path to the CSV file containing the College
+            Scorecard data.
+        method (str): "copy", "pipeline" or "values"; see load_many.
+    """
+    load_many([file_path], method=method)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python load_scorecard.py <csv_file>")
-        sys.exit(1)
-    load_scorecard_data(sys.argv[1])
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(
+        description="Load College Scorecard CSV files into the database.")
+    parser.add_argument("csv_files", nargs="+",
+                        help="MERGEDYYYY_YY_*.csv files, loaded together")
+    parser.add_argument("--method", choices=LOAD_METHODS, default="copy",
+                        help="copy (default), or pipeline/values where "
+                             "the server does not allow COPY")
+    parser.add_argument("--page-size", type=int, default=1000,
+                        help="rows per INSERT page for pipeline/values")
+    parser.add_argument("--rebuild-indexes", action="store_true",
+                        help="drop secondary indexes for the load and "
+                             "rebuild them after; for initial loads")
+    parser.add_argument("--skip-triggers", action="store_true",
+                        help="skip foreign key checks and triggers during "
+                             "the load; needs superuser")
+    args = parser.parse_args()
+    load_many(args.csv_files, skip_triggers=args.skip_triggers,
+              method=args.method, page_size=args.page_size,
+              rebuild_indexes=args.rebuild_indexes)
+    get_pool().close()
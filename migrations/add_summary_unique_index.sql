@@ -0,0 +1,6 @@
+-- For databases created before vw_year_summary had a unique index: lets
+-- the loaders refresh it CONCURRENTLY, without blocking dashboard reads.
+-- The old YEAR index is covered by the new one's leading column.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vw_year_summary_year_unitid
+ON vw_year_summary (YEAR, UNITID);
+DROP INDEX IF EXISTS idx_vw_year_summary_year;
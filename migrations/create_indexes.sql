@@ -0,0 +1,4 @@
+-- Lets the dashboard's top-10 faculty salary query read the first ten
+-- index entries instead of sorting all of Financial_Data
+CREATE INDEX idx_fin_avgfacsal_desc ON Financial_Data (AVGFACSAL DESC)
+WHERE AVGFACSAL IS NOT NULL;
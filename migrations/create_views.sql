@@ -0,0 +1,26 @@
+-- Per-year summary shared by the dashboard analyses. Joins Institutions,
+-- Location and IPEDS_Directory once, with that year's Financial_Data (if any).
+-- Refresh after loading new data:
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY vw_year_summary;
+CREATE MATERIALIZED VIEW vw_year_summary AS
+SELECT
+    ipeds.YEAR,
+    inst.UNITID,
+    inst.INSTNM,
+    inst.CONTROL,
+    loc.STABBR,
+    ipeds.CCBASIC,
+    fin.UNITID IS NOT NULL AS HAS_FINANCIAL_DATA,  -- TRUE when a Financial_Data row exists
+    fin.TUITIONFEE_IN,
+    fin.TUITIONFEE_OUT,
+    fin.CDR3,
+    fin.AVGFACSAL
+FROM Institutions inst
+JOIN Location loc ON loc.UNITID = inst.UNITID
+JOIN IPEDS_Directory ipeds ON ipeds.UNITID = inst.UNITID
+LEFT JOIN Financial_Data fin ON fin.UNITID = inst.UNITID AND fin.YEAR = ipeds.YEAR;
+
+-- Every dashboard query filters on a single year. Unique, so the loaders
+-- can use REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX idx_vw_year_summary_year_unitid
+ON vw_year_summary (YEAR, UNITID);
@@ -0,0 +1,502 @@
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote
+import streamlit as st
+from streamlit.runtime.scriptrunner import (
+    add_script_run_ctx, get_script_run_ctx)
+import pandas as pd
+from psycopg_pool import ConnectionPool
+import credentials
+
+try:
+    # Optional: streams results as Arrow record batches instead of Python rows
+    import adbc_driver_postgresql.dbapi as adbc
+except ImportError:
+    adbc = None
+
+try:
+    # Optional: native, partitionable reads for queries without parameters
+    import connectorx as cx
+except ImportError:
+    cx = None
+
+
+def connection_uri():
+    """
+    Builds a libpq connection URI from the credentials module.
+
+    Returns:
+    str: A postgresql:// URI accepted by the ADBC driver.
+    """
+    return (f"postgresql://{quote(credentials.DB_USER, safe='')}:"
+            f"{quote(credentials.DB_PASSWORD, safe='')}@"
+            f"{credentials.DB_HOST}/{credentials.DB_NAME}")
+
+
+def numbered_placeholders(query):
+    """
+    Rewrites psycopg-style %s placeholders as PostgreSQL $1, $2, ...
+
+    Parameters:
+    query (str): An SQL query using %s placeholders.
+
+    Returns:
+    str: The same query using numbered placeholders.
+    """
+    counter = iter(range(1, query.count("%s") + 1))
+    return re.sub(r"%s", lambda _: f"${next(counter)}", query)
+
+
+# Low-cardinality label columns stored as pandas categoricals
+CATEGORY_COLUMNS = ("type", "state", "category", "carnegie_classification")
+
+
+# Institution CONTROL codes and their labels, in display order
+CONTROL_LABELS = {
+    "1": "Public",
+    "2": "Private non-profit",
+    "3": "Private for-profit",
+    "4": "Foreign",
+}
+
+
+def categorize(df):
+    """
+    Converts low-cardinality label columns to the category dtype.
+
+    The type column gets fixed categories in CONTROL_LABELS order, so
+    legends and colors stay stable across years and queries.
+
+    Parameters:
+    df (pd.DataFrame): A query result.
+
+    Returns:
+    pd.DataFrame: The same frame with CATEGORY_COLUMNS as categoricals.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col not in df:
+            continue
+        if col == "type":
+            labels = list(CONTROL_LABELS.values())
+            # Keep any undecoded codes rather than turning them into NaN
+            extra = sorted(set(df[col].dropna()) - set(labels))
+            df[col] = pd.Categorical(df[col], categories=labels + extra)
+        else:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def normalize(df):
+    """
+    Lowercases column names and applies categorize() to a query result.
+
+    Runs once per cache miss, so the analyses can rely on lowercase names
+    without renaming on every rerun.
+
+    Parameters:
+    df (pd.DataFrame): A query result.
+
+    Returns:
+    pd.DataFrame: The same frame with lowercase, categorized columns.
+    """
+    df.columns = df.columns.str.lower()
+    return categorize(df)
+
+
+@st.cache_resource
+def get_pool():
+    """
+    Creates a connection pool shared across reruns and sessions.
+
+    Returns:
+    ConnectionPool: A pool of autocommit connections to the database.
+    """
+    return ConnectionPool(
+        min_size=2,
+        # Common pool sizing rule of thumb: two connections per core, plus one
+        max_size=(os.cpu_count() or 1) * 2 + 1,
+        # Recycle connections every 30 minutes
+        max_lifetime=1800,
+        open=True,
+        kwargs={
+            "host": credentials.DB_HOST,
+            "dbname": credentials.DB_NAME,
+            "user": credentials.DB_USER,
+            "password": credentials.DB_PASSWORD,
+            # Read-only dashboard; don't hold a transaction open
+            "autocommit": True,
+            # Prepare every query on first use; pooled connections then
+            # reuse the server-side plan on later calls
+            "prepare_threshold": 0,
+        },
+    )
+
+
+@st.cache_resource
+def get_adbc_connections():
+    """
+    Creates the store of idle ADBC connections shared across reruns.
+
+    Returns:
+    queue.SimpleQueue: Idle connections, filled by adbc_connection().
+    """
+    return queue.SimpleQueue()
+
+
+@contextmanager
+def adbc_connection():
+    """
+    Borrows an ADBC connection, opening one only if none is idle.
+
+    Reusing connections saves a connect and authentication per query.
+    Each borrower gets a connection to itself, so the parallel fetches in
+    query_data_many never share one. A connection that raised is closed
+    rather than returned.
+
+    Yields:
+    adbc_driver_manager.dbapi.Connection: An autocommit connection.
+    """
+    idle = get_adbc_connections()
+    try:
+        connection = idle.get_nowait()
+    except queue.Empty:
+        # Autocommit, like the pool: no transaction held between queries
+        connection = adbc.connect(connection_uri(), autocommit=True)
+    try:
+        yield connection
+    except Exception:
+        connection.close()
+        raise
+    idle.put(connection)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_data(query, parameters=None, chunksize=None, partition_on=None,
+               partition_num=4):
+    """
+    Executes an SQL query and caches the result by (query, parameters).
+
+    Parameters:
+    query (str): The SQL query to execute.
+    parameters (tuple): Values bound to the query placeholders.
+    chunksize (int): If set, stream the result through a server-side
+        cursor this many rows at a time.
+    partition_on (str): Numeric result column connectorx may split the
+        read on. Only used for queries without parameters; row order is
+        not preserved when set.
+    partition_num (int): Number of parallel partitions.
+
+    Returns:
+    pd.DataFrame: The query result.
+    """
+    # connectorx can't bind parameters, so it only takes fixed queries.
+    # Neither it nor ADBC streams in chunks, so chunked reads skip both.
+    if cx is not None and not parameters and not chunksize:
+        options = {}
+        if partition_on:
+            options = {"partition_on": partition_on,
+                       "partition_num": partition_num}
+        # connectorx wraps the query in a subquery; drop the terminator
+        return normalize(cx.read_sql(connection_uri(),
+                                     query.strip().rstrip(";"),
+                                     return_type="pandas", **options))
+    if adbc is not None and not chunksize:
+        with adbc_connection() as connection, connection.cursor() as cursor:
+            cursor.execute(numbered_placeholders(query), parameters)
+            return normalize(cursor.fetch_arrow_table().to_pandas())
+    with get_pool().connection() as connection:
+        if chunksize:
+            df = fetch_server_side(connection, query, parameters, chunksize)
+        else:
+            df = pd.read_sql_query(query, connection, params=parameters)
+    return normalize(df)
+
+
+def fetch_server_side(connection, query, parameters, chunksize):
+    """
+    Reads a query through a server-side cursor, chunksize rows at a time.
+
+    A client-side cursor receives the whole result before pandas sees the
+    first row; a named cursor keeps it on the server and streams it.
+
+    Parameters:
+    connection (psycopg.Connection): A pooled connection.
+    query (str): The SQL query to execute.
+    parameters (tuple): Values bound to the query placeholders.
+    chunksize (int): Rows fetched per round trip.
+
+    Returns:
+    pd.DataFrame: The query result.
+    """
+    # Server-side cursors only live inside a transaction; the pool's
+    # connections are autocommit, so open one explicitly
+    with connection.transaction(), \
+            connection.cursor(name="fetch_data") as cursor:
+        cursor.itersize = chunksize
+        cursor.execute(query, parameters)
+        columns = [column.name for column in cursor.description]
+        frames = []
+        while batch := cursor.fetchmany(chunksize):
+            frames.append(pd.DataFrame(batch, columns=columns))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def parameter_error(query, parameters):
+    """
+    Checks that a query gets one parameter per placeholder.
+
+    Parameters:
+    query (str): The SQL query to execute.
+    parameters (tuple): Values bound to the query placeholders.
+
+    Returns:
+    str: An error message, or None if the counts match.
+    """
+    expected = query.count("%s")
+    if len(parameters or ()) != expected:
+        return (f"Invalid query: expected {expected} parameter(s), got "
+                f"{len(parameters or ())}")
+    return None
+
+
+def query_data(query, parameters=None, chunksize=None, partition_on=None):
+    """
+    Executes an SQL query and returns the result as a pandas DataFrame.
+
+    Failed queries are reported in the dashboard and are not cached.
+
+    Parameters:
+    query (str): The SQL query to execute.
+    parameters (tuple): Values bound to the query placeholders.
+    chunksize (int): Optional number of rows to read at a time.
+    partition_on (str): Optional column to parallelize the read on.
+
+    Returns:
+    pd.DataFrame: The query result, or an empty DataFrame if the query
+    failed.
+    """
+    # Normalize to a tuple so list and tuple arguments share a cache key
+    if parameters is not None:
+        parameters = tuple(parameters)
+    error = parameter_error(query, parameters)
+    if error:
+        st.error(error)
+        return pd.DataFrame()
+    try:
+        return fetch_data(query, parameters, chunksize, partition_on)
+    except Exception as e:
+        st.error(f"Invalid query: {e}")
+        return pd.DataFrame()
+
+
+def query_data_many(queries, parameters=None):
+    """
+    Executes several queries concurrently with the same parameters.
+
+    Each query runs on its own pooled connection, so the wall time is that
+    of the slowest query rather than the sum. Errors are reported from the
+    calling thread, where Streamlit can render them. The worker threads
+    carry the script's run context, so fetch_data's cache works there.
+
+    Parameters:
+    queries (list): The SQL queries to execute.
+    parameters (tuple): Values bound to each query's placeholders.
+
+    Returns:
+    list: One DataFrame per query, in order; empty for failed queries.
+    """
+    if parameters is not None:
+        parameters = tuple(parameters)
+    if not queries:
+        return []
+    errors = [parameter_error(query, parameters) for query in queries]
+    ctx = get_script_run_ctx()
+
+    def attach_context():
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=len(queries),
+                            initializer=attach_context) as executor:
+        futures = [None if error else
+                   executor.submit(fetch_data, query, parameters)
+                   for query, error in zip(queries, errors)]
+    results = []
+    for future, error in zip(futures, errors):
+        if future is not None:
+            try:
+                results.append(future.result())
+                continue
+            except Exception as e:
+                error = f"Invalid query: {e}"
+        st.error(error)
+        results.append(pd.DataFrame())
+    return results
+
+
+# Decode institution CONTROL codes to labels in SQL so pandas receives the
+# final strings. Unqualified so it works against Institutions and the
+# vw_year_summary view alike.
+TYPE_LABEL = "\n    CASE control" + "".join(
+    f"\n        WHEN '{code}' THEN '{label}'"
+    for code, label in CONTROL_LABELS.items()
+) + "\n        ELSE control\n    END"
+
+# Set up queries
+query1 = f"""
+    SELECT stabbr AS state, {TYPE_LABEL} AS type, COUNT(*) AS
+    num_institutions
+    FROM vw_year_summary
+    WHERE year = %s
+    GROUP BY stabbr, control
+    ORDER BY stabbr;
+"""
+
+# SQL query for tuition rates summary
+query_tuition_summary1 = """
+    SELECT
+        STABBR AS state,
+        CCBASIC AS carnegie_classification,
+        AVG(TUITIONFEE_IN)::float8 AS avg_in_state_tuition,
+        AVG(TUITIONFEE_OUT)::float8 AS avg_out_state_tuition
+    FROM
+        vw_year_summary
+    WHERE
+        YEAR = %s AND HAS_FINANCIAL_DATA
+    GROUP BY
+        STABBR,
+        CCBASIC
+    ORDER BY
+        STABBR,
+        CCBASIC;
+"""
+
+query_tuition_summary2 = """
+    SELECT
+        CCBASIC AS carnegie_classification,
+        AVG(TUITIONFEE_IN)::float8 AS avg_in_state_tuition,
+        AVG(TUITIONFEE_OUT)::float8 AS avg_out_state_tuition
+    FROM
+        vw_year_summary
+    WHERE
+        YEAR = %s AND HAS_FINANCIAL_DATA
+    GROUP BY
+        CCBASIC
+    ORDER BY
+        CCBASIC;
+"""
+
+# Best- and worst-performing institutions by loan repayment rates. Reads
+# the base tables rather than vw_year_summary: the view only has years with
+# an IPEDS_Directory row, and repayment never depended on IPEDS data.
+query_repayment = """
+    WITH ranked AS (
+        SELECT
+            inst.INSTNM AS institution_name,
+            loc.STABBR AS state,
+            fin.CDR3 AS loan_repayment_rate,
+            -- Lowest default rates are the best repayment rates
+            ROW_NUMBER() OVER (ORDER BY fin.CDR3 ASC) AS rn_best,
+            ROW_NUMBER() OVER (ORDER BY fin.CDR3 DESC) AS rn_worst
+        FROM
+            Financial_Data fin
+        JOIN
+            Institutions inst ON inst.UNITID = fin.UNITID
+        JOIN
+            Location loc ON loc.UNITID = fin.UNITID
+        WHERE
+            fin.YEAR = %s AND fin.CDR3 IS NOT NULL
+    )
+    -- One row per group an institution ranks in, so with fewer than ten
+    -- institutions one can appear as both Best and Worst
+    SELECT
+        institution_name,
+        state,
+        loan_repayment_rate,
+        grp.category
+    FROM
+        ranked
+    CROSS JOIN LATERAL
+        (VALUES ('Best', rn_best), ('Worst', rn_worst)) AS grp (category, rn)
+    WHERE
+        grp.rn <= 5
+    ORDER BY
+        category, loan_repayment_rate;
+"""
+
+# Aggregate Trends: one pass computes all three averages, so switching
+# metrics only changes which column is plotted (and hits the cache)
+query_aggregate_trends = f"""
+    SELECT
+        fin.YEAR AS year,
+        {TYPE_LABEL} AS type,
+        AVG(fin.TUITIONFEE_IN)::float8 AS avg_in_state_tuition,
+        AVG(fin.TUITIONFEE_OUT)::float8 AS avg_out_state_tuition,
+        AVG(fin.CDR3)::float8 AS avg_loan_repayment_rate
+    FROM
+        Financial_Data fin
+    JOIN
+        Institutions inst ON fin.UNITID = inst.UNITID
+    GROUP BY
+        fin.YEAR, inst.CONTROL
+    ORDER BY
+        fin.YEAR, inst.CONTROL;
+    """
+
+# Query data; DECIMAL columns are cast so both drivers return float64
+query_correlation = """
+    SELECT
+        inst.INSTNM AS institution_name,
+        fin.TUITIONFEE_IN::float8 AS in_state_tuition,
+        fin.TUITIONFEE_OUT::float8 AS out_state_tuition,
+        fin.CDR3::float8 AS loan_repayment_rate,
+        fin.AVGFACSAL::float8 AS avg_faculty_salary
+    FROM
+        Financial_Data fin
+    JOIN
+        Institutions inst ON fin.UNITID = inst.UNITID
+    WHERE
+        fin.YEAR = %s
+    ORDER BY
+        inst.INSTNM;
+"""
+
+# Query to fetch graduate debt trends
+query_grad_debt = """
+    SELECT
+        YEAR AS year,
+        AVG(GRAD_DEBT_MDN)::float8 AS avg_grad_debt
+    FROM
+        Admissions_Data
+    WHERE
+        GRAD_DEBT_MDN IS NOT NULL
+    GROUP BY
+        YEAR
+    ORDER BY
+        YEAR;
+"""
+
+# SQL query to fetch top institutions
+# Enhanced SQL query to include institution type
+query_top_salaries_enhanced = f"""
+    SELECT
+        inst.INSTNM AS institution_name,
+        fin.AVGFACSAL::float8 AS avg_faculty_salary,
+        fin.TUITIONFEE_IN::float8 AS in_state_tuition,
+        fin.TUITIONFEE_OUT::float8 AS out_state_tuition,
+        {TYPE_LABEL} AS type
+    FROM
+        Financial_Data fin
+    JOIN
+        Institutions inst ON fin.UNITID = inst.UNITID
+    WHERE
+        fin.AVGFACSAL IS NOT NULL
+    ORDER BY
+        fin.AVGFACSAL DESC
+    LIMIT 10;
+"""